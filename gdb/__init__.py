@@ -14,8 +14,19 @@
 ## limitations under the License.
 ############################################################################
 
+import array
+import atexit
+import json
 import lldb
-from typing import Any, Dict, List, Optional, Tuple, Union
+import math
+import os
+import re
+import struct
+import sys
+import tempfile
+import time
+from typing import (Any, Callable, Dict, List, NamedTuple, Optional, Sequence,
+                    Tuple, Union)
 
 
 class error(RuntimeError):
@@ -42,15 +53,23 @@ current_target = None
 # `default_debugger` set from `__lldb_init_module`, and will be used when there
 # is no `current_target` set from a prettyprinter.
 def gala_set_current_target(sbtarget: lldb.SBTarget) -> None:
-    global current_target
+    global current_target, _callback_stop_key, _callback_frame
+    global _callback_settings_key
     old_target = current_target
     current_target = sbtarget
+    _callback_stop_key = None
+    _callback_frame = None
+    _callback_settings_key = None
     return old_target
 
 
 def gala_reset_current_target() -> None:
-    global current_target
+    global current_target, _callback_stop_key, _callback_frame
+    global _callback_settings_key
     current_target = None
+    _callback_stop_key = None
+    _callback_frame = None
+    _callback_settings_key = None
 
 
 def gala_get_current_target() -> lldb.SBTarget:
@@ -74,6 +93,89 @@ def gala_get_current_debugger() -> lldb.SBDebugger:
         return lldb.debugger
 
 
+class _TargetState:
+    """Caches that are only valid for a single target."""
+
+    def __init__(self, sbtarget: Optional[lldb.SBTarget]):
+        self.sbtarget = sbtarget
+        # Interned `Type` objects, grouped by `_type_intern_key`. See
+        # `Type.__new__`. Cleared when modules are (un)loaded, so we don't keep
+        # types of unloaded modules alive.
+        self.types: Dict[Any, List['Type']] = {}
+        # (derived type, base type) -> offset of the base class subobject, or
+        # None if it's not a base class. See `Type._base_class_offset`.
+        self.base_class_offsets: Dict[Tuple['Type', 'Type'], Optional[int]] = {}
+        # Builtin type name -> `Type`. See `_builtin_type`.
+        self.builtin_types: Dict[str, 'Type'] = {}
+        # 'big' or 'little', computed on first use. See `_target_byte_order`.
+        self.byte_order: Optional[str] = None
+        # Normalized type name -> result of `lookup_type`, or None if there is
+        # no such type. See `_lookup_type_cache`.
+        self.lookup_types: Dict[str, Optional['Type']] = {}
+        # Listens for module (un)loads, which invalidate `lookup_types`.
+        self.module_listener: Optional[lldb.SBListener] = None
+        # Module UUID -> loaded module, computed on first use and recomputed
+        # after modules are (un)loaded. See `_find_first_type`.
+        self.modules_by_uuid: Optional[Dict[str, lldb.SBModule]] = None
+        # (frame key, expression) -> result of `parse_and_eval`, only valid
+        # for the stop in `expressions_stop_key`.
+        self.stop_expressions: Dict[Tuple[Any, str], 'Value'] = {}
+        self.expressions_stop_key: Optional[Tuple[int, int, int]] = None
+        # Frame key -> (function name, type `this` points to), and
+        # (frame key, name) -> whether a local or a member of `this` shadows a
+        # global with that name. Also only valid for `expressions_stop_key`.
+        # See `_frame_scope` and `_is_shadowed`.
+        self.frame_scopes: Dict[Any, Tuple[Optional[str],
+                                           Optional['Type']]] = {}
+        self.shadowed_names: Dict[Tuple[Any, str], bool] = {}
+        # (scope, expression) -> where to find its result, for expressions
+        # that only use globals and constants. The scope is the function the
+        # expression was evaluated in if it starts with an unqualified name,
+        # which may resolve differently in other functions, and None
+        # otherwise. Valid until modules are (un)loaded or the process with
+        # unique ID `global_expressions_process` goes away.
+        self.global_expressions: Dict[Tuple[Optional[str], str],
+                                      '_GlobalExpression'] = {}
+        self.global_expressions_process: Optional[int] = None
+        # Caches of modules built on top of GALA, like gala_bulk, that depend
+        # on the types of this target. See `gala_target_caches`.
+        self.module_caches: Dict[Any, Any] = {}
+        # Setting name -> converted value, only valid while `_settings_key`
+        # returns `settings_key`. See `_get_setting`.
+        self.settings: Dict[str, Any] = {}
+        self.settings_key: Any = None
+
+
+_target_states: Dict[Optional[Tuple[int, int]], _TargetState] = {}
+# The last target we looked up, and its state. Printers keep asking for the
+# state of the same `current_target` object, so this saves us a few SB calls.
+_last_target_and_state: Tuple[Any, Optional[_TargetState]] = (None, None)
+
+
+def _target_state(sbtarget: Optional[lldb.SBTarget] = None) -> _TargetState:
+    """Returns the GALA caches for `sbtarget`, or the current target."""
+    global _last_target_and_state
+    if sbtarget is None:
+        sbtarget = gala_get_current_target()
+    last_target, last_state = _last_target_and_state
+    if last_state is not None and (sbtarget is last_target or
+                                   sbtarget == last_target):
+        return last_state
+    if sbtarget and sbtarget.IsValid():
+        debugger = sbtarget.GetDebugger()
+        key = (debugger.GetID(), debugger.GetIndexOfTarget(sbtarget))
+    else:
+        key = None
+    state = _target_states.get(key)
+    # Target indices are reused when targets are deleted, so double check we
+    # still have the same target.
+    if state is None or (key is not None and not state.sbtarget == sbtarget):
+        state = _TargetState(sbtarget)
+        _target_states[key] = state
+    _last_target_and_state = (sbtarget, state)
+    return state
+
+
 VERSION="10.0"
 
 
@@ -207,8 +309,247 @@ BUILTIN_TYPE_NAME_TO_BASIC_TYPE = {
 
 
 def get_builtin_sbtype(typename: str) -> lldb.SBType:
-    return gala_get_current_target().GetBasicType(
-        BUILTIN_TYPE_NAME_TO_BASIC_TYPE[typename])
+    return _builtin_type(typename).sbtype()
+
+
+def _builtin_type(typename: str) -> 'Type':
+    """Like `get_builtin_sbtype`, but cached and returning a `Type`."""
+    builtin_types = _target_state().builtin_types
+    result = builtin_types.get(typename)
+    if result is None:
+        result = Type(gala_get_current_target().GetBasicType(
+            BUILTIN_TYPE_NAME_TO_BASIC_TYPE[typename]))
+        builtin_types[typename] = result
+    return result
+
+
+# Whitespace around these characters doesn't change the meaning of a type name.
+_TYPE_NAME_PUNCTUATION_RE = re.compile(r'\s*([<>,:*&()\[\]])\s*')
+
+
+def _normalize_type_name(name: str) -> str:
+    """Returns a canonical spelling of `name`, to be used as a cache key.
+
+    For example, 'std::map<int, int>', '::std::map<int,int>' and
+    'std::map< int, int >' all have the same normalized name.
+    """
+    name = _TYPE_NAME_PUNCTUATION_RE.sub(r'\1', ' '.join(name.split()))
+    if name.startswith('::'):
+        name = name[2:]
+    return name
+
+
+_MODULE_EVENTS = (lldb.SBTarget.eBroadcastBitModulesLoaded |
+                  lldb.SBTarget.eBroadcastBitModulesUnloaded |
+                  lldb.SBTarget.eBroadcastBitSymbolsLoaded)
+
+
+def _lookup_type_cache() -> Optional[Dict[str, Optional['Type']]]:
+    """Returns the `lookup_type` results cache for the current target.
+
+    Results are only valid until modules are loaded or unloaded, because that
+    changes the set of types we can find. Returns None if there is no target
+    to cache results for.
+    """
+    state = _target_state()
+    if not state.sbtarget or not state.sbtarget.IsValid():
+        return None
+    _check_module_events(state)
+    return state.lookup_types
+
+
+def _check_module_events(state: _TargetState) -> None:
+    """Clears the caches of `state` that depend on the loaded modules, if
+    modules were loaded or unloaded since the last call."""
+    if state.module_listener is None:
+        state.module_listener = lldb.SBListener('gala.modules')
+        state.sbtarget.GetBroadcaster().AddListener(state.module_listener,
+                                                    _MODULE_EVENTS)
+        return
+    event = lldb.SBEvent()
+    # Doesn't block if there are no events.
+    if state.module_listener.GetNextEvent(event):
+        while state.module_listener.GetNextEvent(event):
+            pass
+        state.lookup_types.clear()
+        state.types.clear()
+        state.base_class_offsets.clear()
+        state.modules_by_uuid = None
+        state.global_expressions.clear()
+        state.module_caches.clear()
+        gala_flush_type_index()
+
+
+def gala_target_caches() -> Dict[Any, Any]:
+    """Returns a dict where other modules can cache data about the current
+    target. It is emptied when modules are (un)loaded. This is a GALA
+    extension."""
+    state = _target_state()
+    _check_module_events(state)
+    return state.module_caches
+
+
+# `_TypeIndex.add` writes the index when this many entries are pending, or when
+# this many seconds have passed since it was last written.
+_TYPE_INDEX_MAX_PENDING = 256
+_TYPE_INDEX_FLUSH_INTERVAL = 60
+
+
+class _TypeIndex:
+    """Remembers which module defines each type name, across sessions.
+
+    The index is a JSON file mapping module UUIDs to the names of the types
+    `lookup_type` found in them. A UUID identifies one particular build of a
+    module, so entries never go stale: they are just not used when that build
+    isn't loaded.
+
+    New entries are written together by `flush`: when modules are (un)loaded
+    and at exit. lldb doesn't always run `atexit` handlers, so `add` also
+    flushes once enough entries are pending or enough time has passed since
+    the last flush.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        # Normalized type name -> UUIDs of modules defining it. Read from disk
+        # on first use.
+        self._uuids_by_name: Optional[Dict[str, List[str]]] = None
+        # UUID -> type names added since the last `flush`.
+        self._pending: Dict[str, List[str]] = {}
+        self._num_pending = 0
+        self._last_flush = time.monotonic()
+
+    def _read(self) -> Dict[str, List[str]]:
+        try:
+            with open(self._path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {uuid: names for uuid, names in data.items()
+                if isinstance(names, list)}
+
+    def _load(self) -> Dict[str, List[str]]:
+        if self._uuids_by_name is None:
+            self._uuids_by_name = {}
+            for uuid, names in self._read().items():
+                for name in names:
+                    self._uuids_by_name.setdefault(name, []).append(uuid)
+        return self._uuids_by_name
+
+    def modules_for(self, name: str) -> List[str]:
+        """Returns the UUIDs of the modules known to define type `name`."""
+        return self._load().get(name, [])
+
+    def add(self, name: str, uuid: str) -> None:
+        uuids = self._load().setdefault(name, [])
+        if uuid in uuids:
+            return
+        uuids.append(uuid)
+        self._pending.setdefault(uuid, []).append(name)
+        self._num_pending += 1
+        if (self._num_pending >= _TYPE_INDEX_MAX_PENDING or
+            time.monotonic() - self._last_flush >= _TYPE_INDEX_FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the entries added since the last call to disk."""
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = {}
+        self._num_pending = 0
+        self._last_flush = time.monotonic()
+        # Merge with what other sessions may have written in the meantime.
+        data = self._read()
+        for uuid, new_names in pending.items():
+            names = data.setdefault(uuid, [])
+            names.extend(n for n in new_names if n not in names)
+        directory = os.path.dirname(self._path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temporary file first, so that readers never see a
+            # partially written index.
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self._path)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            # The index is just an optimization.
+            pass
+
+
+_type_index: Optional[_TypeIndex] = None
+
+
+def _get_type_index() -> Optional[_TypeIndex]:
+    """Returns the on-disk type index, or None if it's disabled.
+
+    The index lives in $GALA_TYPE_INDEX if set (an empty value disables it),
+    or in the user's cache directory otherwise.
+    """
+    global _type_index
+    if _type_index is None:
+        path = os.environ.get('GALA_TYPE_INDEX')
+        if path is None:
+            cache_home = (os.environ.get('XDG_CACHE_HOME') or
+                          os.path.join(os.path.expanduser('~'), '.cache'))
+            path = os.path.join(cache_home, 'gala', 'type_index.json')
+        if not path:
+            return None
+        _type_index = _TypeIndex(path)
+        atexit.register(_type_index.flush)
+    return _type_index
+
+
+def gala_flush_type_index() -> None:
+    """Writes the types found so far to the type index. This is a GALA
+    extension."""
+    if _type_index is not None:
+        _type_index.flush()
+
+
+def _modules_by_uuid() -> Dict[str, lldb.SBModule]:
+    state = _target_state()
+    if state.modules_by_uuid is None:
+        state.modules_by_uuid = {}
+        target = gala_get_current_target()
+        for i in range(target.GetNumModules()):
+            module = target.GetModuleAtIndex(i)
+            uuid = module.GetUUIDString()
+            if uuid:
+                state.modules_by_uuid[uuid] = module
+    return state.modules_by_uuid
+
+
+def _find_first_type(name: str, normalized_name: str) -> lldb.SBType:
+    """Like `SBTarget.FindFirstType`, but using the on-disk type index.
+
+    If the index knows which module defines `normalized_name`, only that
+    module is searched. Otherwise all modules are, and the module the type was
+    found in is added to the index.
+    """
+    index = _get_type_index()
+    if index is not None:
+        modules = _modules_by_uuid()
+        for uuid in index.modules_for(normalized_name):
+            module = modules.get(uuid)
+            if module is not None:
+                t = module.FindFirstType(name)
+                if t:
+                    return t
+    t = gala_get_current_target().FindFirstType(name)
+    # `SBType.GetModule` is not available in older versions of lldb.
+    if t and index is not None and hasattr(t, 'GetModule'):
+        uuid = t.GetModule().GetUUIDString()
+        if uuid:
+            index.add(normalized_name, uuid)
+    return t
 
 
 def _format_enum_value_name(enum_sbtype: lldb.SBType, name: str) -> str:
@@ -231,6 +572,11 @@ def _format_enum_value_name(enum_sbtype: lldb.SBType, name: str) -> str:
 
 
 class Field(object):
+  # Fields are computed once per type and shared by every caller of
+  # `Type.fields()`, so they are read-only.
+  __slots__ = ('name', 'type', 'bitpos', 'enumval', 'bitsize', 'parent_type',
+               'is_base_class', 'artificial')
+
   def __init__(self,
                name: str,
                type: 'Type',
@@ -239,53 +585,179 @@ class Field(object):
                parent_type: 'Type',
                is_base_class: bool,
                enumval: Optional[int] = None):
-        self.name = name
-        self.type = type
+        init = super(Field, self).__setattr__
+        init('name', name)
+        init('type', type)
         # Enum fields have enumval, but not bitpos. Note that 0 is falsey, so
         # we have to check explicitly for not None.
         if enumval is not None:
-            self.enumval = enumval
+            init('enumval', enumval)
         else:
-            self.bitpos = bitpos
-        self.bitsize = bitsize
-        self.parent_type = parent_type
-        self.is_base_class = is_base_class
-        self.artificial = False
+            init('bitpos', bitpos)
+        init('bitsize', bitsize)
+        init('parent_type', parent_type)
+        init('is_base_class', is_base_class)
+        init('artificial', False)
+
+  def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError('gdb.Field attributes are read-only.')
+
+  def _with_parent_type(self, parent_type: 'Type') -> 'Field':
+        """Returns a copy of this field with a different `parent_type`."""
+        return Field(name=self.name,
+                     type=self.type,
+                     bitpos=getattr(self, 'bitpos', None),
+                     bitsize=self.bitsize,
+                     parent_type=parent_type,
+                     is_base_class=self.is_base_class,
+                     enumval=getattr(self, 'enumval', None))
+
+
+def _type_intern_key(sbtype: lldb.SBType, name: Optional[str]) -> Any:
+    """Returns the key `Type` objects for `sbtype` are interned under.
+
+    That's the type name, except for anonymous types, which would otherwise
+    all end up under the same key. Those are told apart by their layout.
+    """
+    if name and not name.startswith('('):
+        return name
+    num_fields = sbtype.GetNumberOfFields()
+    first_field = last_field = None
+    if num_fields:
+        first_field = sbtype.GetFieldAtIndex(0).GetName()
+        last_field = sbtype.GetFieldAtIndex(num_fields - 1).GetName()
+    return (name, sbtype.GetTypeClass(), sbtype.GetByteSize(), num_fields,
+            first_field, last_field)
 
 
 class Type(object):
-    def __init__(self, sbtype_object: lldb.SBType):
+    # `Type` objects are interned: wrapping equal `SBType`s of the same target
+    # returns the same `Type` object. This way, properties computed from the
+    # `SBType` can be cached in the `Type` and reused by everyone.
+    #
+    # `state` is the `_TargetState` of the target `sbtype_object` belongs to,
+    # the current target by default. Types derived from a `Type` (pointers,
+    # fields...) belong to the same target.
+    def __new__(cls, sbtype_object: lldb.SBType,
+                state: Optional[_TargetState] = None) -> 'Type':
+        if state is None:
+            state = _target_state()
+        name = sbtype_object.GetName()
+        key = _type_intern_key(sbtype_object, name)
+        same_key_types = state.types.setdefault(key, [])
+        for t in same_key_types:
+            if t._sbtype_object == sbtype_object:
+                return t
+        self = super(Type, cls).__new__(cls)
         self._sbtype_object = sbtype_object
+        self._state = state
+        self._name = name
+        self._type_class = None
+        self._code = None
+        self._sizeof = None
+        self._type_flags = None
+        self._alignof = None
+        self._stripped = None
+        self._unqualified = None
+        self._pointer = None
+        self._reference = None
+        self._target = None
+        self._arrays: Dict[int, 'Type'] = {}
+        self._canonical = None
+        self._fields: Optional[Tuple[Field, ...]] = None
+        self._fields_by_name: Optional[Dict[str, Field]] = None
+        self._all_field_names: Optional[frozenset] = None
+        self._member_index: Optional[Dict[str, '_MemberLocation']] = None
+        self._enum_names: Optional[Dict[int, str]] = None
+        self._enum_flags: Optional[Tuple[Tuple[int, str], ...]] = None
+        self._scalar_descriptor: Optional['_ScalarDescriptor'] = None
+        same_key_types.append(self)
+        return self
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Type):
+            return NotImplemented
+        return self._sbtype_object == other._sbtype_object
+
+    def __hash__(self) -> int:
+        return hash(self._name)
 
     def sbtype(self) -> lldb.SBType:
         return self._sbtype_object
 
-    def _is_baseclass(
-            self, baseclass_sbtype: lldb.SBType) -> Tuple[bool, Optional[int]]:
-        base_sbtype = Type(baseclass_sbtype).strip_typedefs().sbtype()
-        self_sbtype = self.strip_typedefs().sbtype()
-        for i in range(self_sbtype.GetNumberOfDirectBaseClasses()):
-            base_mem = self_sbtype.GetDirectBaseClassAtIndex(i)
-            base_sbtype_i = Type(base_mem.GetType()).strip_typedefs().sbtype()
-            if base_sbtype_i == base_sbtype:
-                return (True, base_mem.GetOffsetInBytes())
-            else:
-                is_baseclass, offset = Type(base_sbtype_i)._is_baseclass(
-                    baseclass_sbtype)
-                if is_baseclass:
-                    return (True, base_mem.GetOffsetInBytes() + offset)
-        return (False, None)
+    def _get_type_flags(self) -> int:
+        if self._type_flags is None:
+            self._type_flags = self._sbtype_object.GetTypeFlags()
+        return self._type_flags
+
+    def _is_integral(self) -> bool:
+        """Returns True for integer (including bool and char) and enum types."""
+        return bool(self.strip_typedefs()._get_type_flags() &
+                    (lldb.eTypeIsInteger | lldb.eTypeIsEnumeration))
+
+    def _get_scalar_descriptor(self) -> '_ScalarDescriptor':
+        """Returns how to decode values of this type from their raw bytes.
+
+        Raises TypeError if values of this type can't be converted to numbers.
+        """
+        if self._scalar_descriptor is None:
+            self._scalar_descriptor = _ScalarDescriptor.for_type(self)
+        return self._scalar_descriptor
+
+    def _get_type_class(self) -> int:
+        if self._type_class is None:
+            self._type_class = self._sbtype_object.GetTypeClass()
+        return self._type_class
+
+    def _base_class_offset(self, base_type: 'Type') -> Optional[int]:
+        """Returns the byte offset of `base_type` within this type.
+
+        Returns None if `base_type` is not a (direct or indirect) base class of
+        this type. Results are remembered for each pair of types, including
+        negative ones, so each pair is only computed once per target.
+        """
+        derived = self.strip_typedefs()
+        base = base_type.strip_typedefs()
+        offsets = self._state.base_class_offsets
+        key = (derived, base)
+        if key in offsets:
+            return offsets[key]
+        offset = None
+        if derived._get_type_class() in (lldb.eTypeClassStruct,
+                                         lldb.eTypeClassClass):
+            for f in derived._get_fields():
+                if not f.is_base_class:
+                    continue
+                direct_base = f.type.strip_typedefs()
+                if direct_base == base:
+                    offset = f.bitpos // 8
+                    break
+                inner_offset = direct_base._base_class_offset(base)
+                if inner_offset is not None:
+                    offset = f.bitpos // 8 + inner_offset
+                    break
+        offsets[key] = offset
+        return offset
 
     def __str__(self):
-        return self._sbtype_object.GetName()
+        return self._name
 
     @property
     def alignof(self) -> int:
-        return self._sbtype_object.GetByteAlign()
+        if self._alignof is None:
+            self._alignof = self._sbtype_object.GetByteAlign()
+        return self._alignof
 
     @property
     def code(self) -> int:
-        type_class = self._sbtype_object.GetTypeClass()
+        if self._code is None:
+            self._code = self._compute_code()
+        return self._code
+
+    def _compute_code(self) -> int:
+        type_class = self._get_type_class()
         type_code = TYPE_CLASS_TO_TYPE_CODE_MAP.get(type_class,
                                                     TYPE_CODE_UNDEF)
         # Both member pointers and method pointers have eTypeClassMemberPointer
@@ -306,60 +778,284 @@ class Type(object):
 
     @property
     def name(self) -> str:
-        return self._sbtype_object.GetName()
+        return self._name
 
     @property
     def sizeof(self) -> int:
-        return self._sbtype_object.GetByteSize()
+        if self._sizeof is None:
+            self._sizeof = self._sbtype_object.GetByteSize()
+        return self._sizeof
 
     @property
     def tag(self) -> str:
-        return self._sbtype_object.GetName()
+        return self._name
+
+    @property
+    def is_scalar(self) -> bool:
+        try:
+            return self._get_scalar_descriptor().kind != _SCALAR_ARRAY
+        except TypeError:
+            return False
+
+    @property
+    def is_signed(self) -> bool:
+        if not self.is_scalar:
+            raise ValueError('Type must be a scalar type')
+        descriptor = self._get_scalar_descriptor()
+        return descriptor.kind != _SCALAR_INT or descriptor.signed
 
     def target(self) -> 'Type':
-        type_class = self._sbtype_object.GetTypeClass()
+        if self._target is not None:
+            return self._target
+        type_class = self._get_type_class()
         if type_class == lldb.eTypeClassPointer:
-            return Type(self._sbtype_object.GetPointeeType())
+            self._target = Type(
+                self._sbtype_object.GetPointeeType(), self._state)
         elif type_class == lldb.eTypeClassReference:
-            return Type(self._sbtype_object.GetDereferencedType())
+            self._target = Type(
+                self._sbtype_object.GetDereferencedType(), self._state)
         elif type_class == lldb.eTypeClassArray:
-            return Type(self._sbtype_object.GetArrayElementType())
+            self._target = Type(
+                self._sbtype_object.GetArrayElementType(), self._state)
         elif type_class == lldb.eTypeClassFunction:
-            return Type(self._sbtype_object.GetFunctionReturnType())
+            self._target = Type(
+                self._sbtype_object.GetFunctionReturnType(), self._state)
         else:
-            raise TypeError('Type "%s" cannot have target type.' %
-                            self._sbtype_object.GetName())
+            raise TypeError('Type "%s" cannot have target type.' % self._name)
+        return self._target
 
     def strip_typedefs(self) -> 'Type':
-        sbtype = self._sbtype_object
-        while sbtype.GetTypedefedType():
-            if sbtype == sbtype.GetTypedefedType():
-                break
-            sbtype = sbtype.GetTypedefedType()
-        return Type(sbtype)
+        if self._stripped is None:
+            sbtype = self._sbtype_object
+            while sbtype.GetTypedefedType():
+                if sbtype == sbtype.GetTypedefedType():
+                    break
+                sbtype = sbtype.GetTypedefedType()
+            self._stripped = self if sbtype is self._sbtype_object else Type(
+                sbtype, self._state)
+        return self._stripped
 
     def unqualified(self) -> 'Type':
-        return Type(self._sbtype_object.GetUnqualifiedType())
+        if self._unqualified is None:
+            self._unqualified = Type(
+                self._sbtype_object.GetUnqualifiedType(), self._state)
+        return self._unqualified
 
     def array(self, higher_bound: int) -> 'Type':
         # lldb expects size instead of higher_bound. gdb is pretty permissive
         # with the type of the bound as long as it's somewhat numeric, so we
         # cast it to an int to avoid type errors.
-        return Type(self._sbtype_object.GetArrayType(int(higher_bound) + 1))
+        size = int(higher_bound) + 1
+        result = self._arrays.get(size)
+        if result is None:
+            result = Type(self._sbtype_object.GetArrayType(size), self._state)
+            self._arrays[size] = result
+        return result
 
     def pointer(self) -> 'Type':
-        return Type(self._sbtype_object.GetPointerType())
+        if self._pointer is None:
+            self._pointer = Type(
+                self._sbtype_object.GetPointerType(), self._state)
+        return self._pointer
 
     def reference(self) -> 'Type':
-        return Type(self._sbtype_object.GetReferenceType())
+        if self._reference is None:
+            self._reference = Type(
+                self._sbtype_object.GetReferenceType(), self._state)
+        return self._reference
 
     def template_argument(self, n: int) -> Union['Type', 'Value']:
         # TODO: This is woefully incomplete!
-        return Type(self._sbtype_object.GetTemplateArgumentType(n))
+        return Type(self._sbtype_object.GetTemplateArgumentType(n), self._state)
+
+    def _canonical_type(self) -> 'Type':
+        if self._canonical is None:
+            self._canonical = Type(
+                self._sbtype_object.GetCanonicalType(), self._state)
+        return self._canonical
 
     def fields(self) -> List[Field]:
-        t = self._sbtype_object.GetCanonicalType()
-        type_class = t.GetTypeClass()
+        # Return a new list every time, callers are free to modify it.
+        return list(self._get_fields())
+
+    def _get_fields(self) -> Tuple[Field, ...]:
+        if self._fields is None:
+            canonical = self._canonical_type()
+            if canonical is self:
+                self._fields = tuple(self._compute_fields())
+            else:
+                # Reuse the layout of the canonical type. Only `parent_type`
+                # is different.
+                self._fields = tuple(f._with_parent_type(self)
+                                     for f in canonical._get_fields())
+        return self._fields
+
+    def _get_fields_by_name(self) -> Dict[str, Field]:
+        if self._fields_by_name is None:
+            by_name = {}
+            for f in self._get_fields():
+                if f.name and f.name not in by_name:
+                    by_name[f.name] = f
+            self._fields_by_name = by_name
+        return self._fields_by_name
+
+    def _get_all_field_names(self) -> frozenset:
+        """Returns the names of the fields of this type and all its bases."""
+        if self._all_field_names is None:
+            names = set()
+            type_class = self._canonical_type()._get_type_class()
+            if type_class not in (lldb.eTypeClassStruct, lldb.eTypeClassClass,
+                                  lldb.eTypeClassUnion):
+                # Only aggregates have member fields.
+                self._all_field_names = frozenset()
+                return self._all_field_names
+            for f in self._get_fields():
+                if f.is_base_class:
+                    names.update(f.type.strip_typedefs()._get_all_field_names())
+                elif f.name:
+                    names.add(f.name)
+            self._all_field_names = frozenset(names)
+        return self._all_field_names
+
+    def _has_field(self, name: str) -> bool:
+        """Returns True if this type or any of its bases has a field `name`."""
+        return name in self._get_all_field_names()
+
+    def _get_member_index(self) -> Dict[str, '_MemberLocation']:
+        """Returns a map from member name to the location of that member.
+
+        Like gdb, members of anonymous structs and unions, and members of
+        base classes, can be accessed as if they were direct members. The index
+        resolves those once per type, so `Value.__getitem__` does not have to
+        search the children of every value. Members of virtual base classes are
+        not indexed because their offset depends on the dynamic type.
+        """
+        if self._member_index is None:
+            index: Dict[str, '_MemberLocation'] = {}
+            type_class = self._canonical_type()._get_type_class()
+            if type_class not in (lldb.eTypeClassStruct, lldb.eTypeClassClass,
+                                  lldb.eTypeClassUnion):
+                self._member_index = index
+                return index
+            fields = self._get_fields()
+            # Direct members shadow members of anonymous members and bases.
+            for f in fields:
+                if f.name and not f.is_base_class and f.name not in index:
+                    index[f.name] = _MemberLocation(
+                        (f,), f.bitpos // 8, f.type, f.bitpos, f.bitsize)
+            sbtype = self._canonical_type().sbtype()
+            virtual_bases = [
+                Type(
+                    sbtype.GetVirtualBaseClassAtIndex(i).GetType(), self._state)
+                .strip_typedefs()
+                for i in range(sbtype.GetNumberOfVirtualBaseClasses())]
+            for f in fields:
+                member_type = f.type.strip_typedefs()
+                if f.is_base_class:
+                    if member_type in virtual_bases:
+                        continue
+                elif f.name or not member_type.sbtype().IsAnonymousType():
+                    continue
+                for name, loc in member_type._get_member_index().items():
+                    if name not in index:
+                        index[name] = _MemberLocation(
+                            (f,) + loc.path, f.bitpos // 8 + loc.offset,
+                            loc.type, f.bitpos + loc.bitpos, loc.bitsize)
+            self._member_index = index
+        return self._member_index
+
+    # gdb.Type also supports the mapping protocol, with field names as keys.
+    def __bool__(self) -> bool:
+        return True
+
+    def __len__(self) -> int:
+        return len(self._get_fields())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._get_fields_by_name()
+
+    def __getitem__(self, name: str) -> Field:
+        field = self._get_fields_by_name().get(name)
+        if field is None:
+            raise KeyError(name)
+        return field
+
+    def has_key(self, name: str) -> bool:
+        return name in self
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self._get_fields_by_name().get(name, default)
+
+    def keys(self) -> List[str]:
+        return [f.name for f in self._get_fields()]
+
+    def values(self) -> List[Field]:
+        return self.fields()
+
+    def items(self) -> List[Tuple[str, Field]]:
+        return [(f.name, f) for f in self._get_fields()]
+
+    def _get_enum_names(self) -> Dict[int, str]:
+        """Returns a dict mapping enumerator values to formatted names."""
+        if self._enum_names is None:
+            names = {}
+            # Negative enumerators can also show up as unsigned numbers if the
+            # underlying type is unsigned.
+            unsigned_mask = (1 << (8 * self.sizeof)) - 1
+            for f in self._get_fields():
+                # If there are duplicates, the first enumerator wins.
+                names.setdefault(f.enumval, f.name)
+                names.setdefault(f.enumval & unsigned_mask, f.name)
+            self._enum_names = names
+        return self._enum_names
+
+    def _get_enum_flags(self) -> Tuple[Tuple[int, str], ...]:
+        """Returns the bit decomposition table of a flag enum.
+
+        Like gdb, we consider an enum to be a "flag enum" if all enumerators
+        are non-negative and no two of them have bits in common. The result is
+        a tuple of (mask, name) pairs for the nonzero enumerators, or an empty
+        tuple if this is not a flag enum.
+        """
+        if self._enum_flags is None:
+            flags = []
+            seen_bits = 0
+            for f in self._get_fields():
+                if f.enumval < 0 or f.enumval & seen_bits:
+                    flags = []
+                    break
+                if f.enumval:
+                    seen_bits |= f.enumval
+                    flags.append((f.enumval, f.name))
+            self._enum_flags = tuple(flags)
+        return self._enum_flags
+
+    def _format_enum_value(self, value: int) -> str:
+        """Formats an enum value like gdb does."""
+        name = self._get_enum_names().get(value)
+        if name is not None:
+            return name
+        flags = self._get_enum_flags()
+        if not flags or value < 0:
+            return str(value)
+        # Decompose values of flag enums: `(A | B | unknown: 0x8)`.
+        parts = []
+        for mask, flag_name in flags:
+            if value & mask == mask:
+                parts.append(flag_name)
+                value &= ~mask
+        if value:
+            parts.append('unknown: 0x%x' % value)
+        if not parts:
+            return '0'
+        return '(%s)' % ' | '.join(parts)
+
+    def _compute_fields(self) -> List[Field]:
+        t = self._sbtype_object
+        type_class = self._get_type_class()
         fields = []
         if type_class == lldb.eTypeClassEnumeration:
             enum_list = t.GetEnumMembers()
@@ -380,7 +1076,7 @@ class Type(object):
             for i in range(0, n_baseclasses):
                 c = t.GetDirectBaseClassAtIndex(i)
                 fields.append(Field(name=c.GetName(),
-                                    type=Type(c.GetType()),
+                                    type=Type(c.GetType(), self._state),
                                     bitpos=c.GetOffsetInBits(),
                                     bitsize=0,
                                     parent_type=self,
@@ -388,7 +1084,7 @@ class Type(object):
             for i in range(0, t.GetNumberOfFields()):
                 f = t.GetFieldAtIndex(i)
                 fields.append(Field(name=f.GetName(),
-                                    type=Type(f.GetType()),
+                                    type=Type(f.GetType(), self._state),
                                     bitpos=f.GetOffsetInBits(),
                                     bitsize=f.GetBitfieldSizeInBits(),
                                     parent_type=self,
@@ -398,6 +1094,209 @@ class Type(object):
         return fields
 
 
+class _MemberLocation(NamedTuple):
+    # The fields to go through to reach the member, the last one being the
+    # member itself.
+    path: Tuple[Field, ...]
+    # Offset of the member from the start of the indexed type.
+    offset: int
+    type: Type
+    # Like `offset`, but in bits. Only meaningful for bitfields.
+    bitpos: int
+    bitsize: int
+
+
+# Kinds of `_ScalarDescriptor`.
+_SCALAR_INT = 0
+_SCALAR_FLOAT = 1
+_SCALAR_X87_LONG_DOUBLE = 2
+_SCALAR_BINARY128 = 3
+_SCALAR_ARRAY = 4
+
+_STRUCT_INT_FORMATS = {1: 'b', 2: 'h', 4: 'i', 8: 'q'}
+
+
+class _ScalarDescriptor(NamedTuple):
+    """Everything needed to decode numbers of some type from raw bytes."""
+    kind: int
+    size: int
+    signed: bool
+    byte_order: str
+    # Precompiled format for `kind` and `size`, or None if `struct` can't
+    # decode it.
+    unpacker: Optional[struct.Struct]
+
+    @staticmethod
+    def for_type(t: 'Type') -> '_ScalarDescriptor':
+        stripped = t.strip_typedefs()
+        sbtype = stripped.sbtype()
+        type_flags = stripped._get_type_flags()
+        if type_flags & lldb.eTypeIsEnumeration:
+            sbtype = sbtype.GetEnumerationIntegerType().GetCanonicalType()
+            type_flags = sbtype.GetTypeFlags()
+        byte_order = _target_byte_order()
+        prefix = '>' if byte_order == 'big' else '<'
+        size = sbtype.GetByteSize()
+        signed = bool(type_flags & lldb.eTypeIsSigned)
+        fmt = None
+        if type_flags & lldb.eTypeIsPointer or type_flags & lldb.eTypeIsInteger:
+            kind = _SCALAR_INT
+            fmt = _STRUCT_INT_FORMATS.get(size)
+            if fmt is not None and not signed:
+                fmt = fmt.upper()
+        elif type_flags & lldb.eTypeIsFloat:
+            kind = _SCALAR_FLOAT
+            basic_type = sbtype.GetBasicType()
+            if basic_type == lldb.eBasicTypeFloat:
+                fmt = 'f'
+            elif basic_type == lldb.eBasicTypeDouble:
+                fmt = 'd'
+            elif basic_type == lldb.eBasicTypeLongDouble:
+                if size == 8:
+                    fmt = 'd'
+                elif (gala_get_current_target().GetTriple() or '').startswith(
+                        ('x86_64', 'i386', 'i486', 'i586', 'i686')):
+                    kind = _SCALAR_X87_LONG_DOUBLE
+                else:
+                    kind = _SCALAR_BINARY128
+            else:
+                raise RuntimeError('Unknown float type %s.' % sbtype.name)
+        elif type_flags & lldb.eTypeIsArray:
+            kind = _SCALAR_ARRAY
+        else:
+            raise TypeError(
+                'Conversion of type %s to number is not supported.'%sbtype.name)
+        unpacker = struct.Struct(prefix + fmt) if fmt is not None else None
+        return _ScalarDescriptor(kind, size, signed, byte_order, unpacker)
+
+    def decode(self, data: bytes, bitfield: Optional[Tuple[int, int]] = None
+               ) -> Union[int, float]:
+        """Decodes a number from `data`.
+
+        `bitfield`, if given, is a (bit offset, bit size) pair locating an
+        integer in `data`, which must hold exactly the bytes the bitfield
+        spans. Like in DWARF, bit offsets count from the least significant bit
+        of the first byte on little endian targets, and from the most
+        significant one on big endian targets.
+        """
+        if bitfield is not None:
+            bit_offset, bitsize = bitfield
+            if self.byte_order == 'big':
+                number = int.from_bytes(data, 'big') >> (
+                    len(data) * 8 - bit_offset - bitsize)
+            else:
+                number = int.from_bytes(data, 'little') >> bit_offset
+            number &= (1 << bitsize) - 1
+            if self.signed and number >> (bitsize - 1):
+                number -= 1 << bitsize
+            return number
+        if self.unpacker is not None:
+            return self.unpacker.unpack_from(data)[0]
+        if self.kind == _SCALAR_INT:
+            return int.from_bytes(data[:self.size], self.byte_order,
+                                  signed=self.signed)
+        if self.kind == _SCALAR_X87_LONG_DOUBLE:
+            # 64-bit mantissa with an explicit integer bit, 15-bit exponent and
+            # a sign bit. Always little endian.
+            mantissa = int.from_bytes(data[0:8], 'little')
+            exponent = int.from_bytes(data[8:10], 'little')
+            sign = -1.0 if exponent & 0x8000 else 1.0
+            exponent &= 0x7fff
+            if exponent == 0x7fff:
+                if mantissa & ((1 << 63) - 1):
+                    return math.nan
+                return sign * math.inf
+            return sign * _ldexp(mantissa, max(exponent, 1) - 16383 - 63)
+        if self.kind == _SCALAR_BINARY128:
+            bits = int.from_bytes(data[:16], self.byte_order)
+            sign = -1.0 if bits >> 127 else 1.0
+            exponent = (bits >> 112) & 0x7fff
+            fraction = bits & ((1 << 112) - 1)
+            if exponent == 0x7fff:
+                return math.nan if fraction else sign * math.inf
+            if exponent:
+                fraction |= 1 << 112
+            return sign * _ldexp(fraction, max(exponent, 1) - 16383 - 112)
+        raise TypeError('Cannot decode a number of this type from memory.')
+
+
+def _ldexp(mantissa: int, exponent: int) -> float:
+    try:
+        return math.ldexp(mantissa, exponent)
+    except OverflowError:
+        return math.inf
+
+
+# The numpy module, imported on first use. False if it's not installed.
+_numpy_module: Any = None
+
+
+def _import_numpy() -> Any:
+    """Returns the numpy module, or None if it's not installed."""
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            import numpy
+            _numpy_module = numpy
+        except ImportError:
+            _numpy_module = False
+    return _numpy_module or None
+
+
+def _element_format(t: 'Type') -> Tuple[str, int]:
+    """Returns the kind of elements of type `t` for bulk conversions.
+
+    The result is a (kind, size) pair where kind is one of 'b' (bool), 'i'
+    (signed integer), 'u' (unsigned integer) or 'f' (float), like in NumPy's
+    array-protocol type strings. Enums are converted as their underlying
+    integer type, and pointers as unsigned integers. Raises TypeError for other
+    types.
+    """
+    stripped = t.strip_typedefs()
+    if stripped.code == TYPE_CODE_BOOL:
+        return 'b', stripped.sizeof
+    descriptor = stripped._get_scalar_descriptor()
+    if descriptor.kind == _SCALAR_INT:
+        return ('i' if descriptor.signed else 'u'), descriptor.size
+    if descriptor.kind == _SCALAR_FLOAT and descriptor.unpacker is not None:
+        return 'f', descriptor.size
+    raise TypeError('Cannot convert elements of type "%s" in bulk.' % t)
+
+
+def _array_from_bytes(data: bytes, t: 'Type') -> Any:
+    """Converts `data` to an array of elements of type `t`.
+
+    Returns a NumPy array if NumPy is available, and an `array.array` if not.
+    """
+    kind, size = _element_format(t)
+    numpy = _import_numpy()
+    if numpy is not None:
+        if kind == 'b':
+            dtype = numpy.dtype(numpy.bool_)
+        else:
+            prefix = '>' if _target_byte_order() == 'big' else '<'
+            dtype = numpy.dtype('%s%s%d' % (prefix, kind, size))
+        # Copy into a bytearray so the result is writable.
+        return numpy.frombuffer(bytearray(data), dtype=dtype)
+    if kind == 'f':
+        candidates = 'fd'
+    elif kind == 'i':
+        candidates = 'bhilq'
+    else:
+        candidates = 'BHILQ'
+    for typecode in candidates:
+        if array.array(typecode).itemsize == size:
+            break
+    else:
+        raise TypeError('No array.array type code for elements of type "%s".'
+                        % t)
+    result = array.array(typecode)
+    result.frombytes(data)
+    if size > 1 and _target_byte_order() != sys.byteorder:
+        result.byteswap()
+    return result
+
+
 def _get_child_member_with_name(
         sbvalue: lldb.SBValue, name: str) -> lldb.SBValue:
     result = sbvalue.GetChildMemberWithName(name)
@@ -413,7 +1312,364 @@ def _get_child_member_with_name(
     return result
 
 
+# Memory is read in blocks aligned to this size, which is the page size on all
+# the platforms we care about. A read that doesn't cross a page boundary can't
+# fail halfway through because the next page happens to be unmapped.
+_MEMORY_PAGE_SIZE = 4096
+# Upper bound for a single read when scanning memory for a string terminator.
+_MAX_STRING_CHUNK_SIZE = 16 * _MEMORY_PAGE_SIZE
+
+
+# Reads spanning more pages than this bypass the page cache, so that one big
+# buffer doesn't evict everything else.
+_MAX_PAGES_PER_CACHED_READ = 16
+# The cache is flushed when it grows beyond this many pages (16MiB).
+_MAX_CACHED_PAGES = 4096
+
+# `Inferior.read_memory_many` reads ranges separated by at most this many bytes
+# with a single read, up to a total of `_MAX_COALESCED_READ` bytes.
+_MAX_COALESCING_GAP = 256
+_MAX_COALESCED_READ = 1024 * 1024
+
+# Each gdb.Value remembers at most this many children returned by
+# `__getitem__`.
+_MAX_CACHED_CHILDREN = 64
+
+
+class _MemoryCache:
+    """A page cache for the memory of a single process.
+
+    Pages are only valid for the stop they were read in. We don't get notified
+    when the process resumes, so instead we remember the stop ID the pages
+    belong to and drop them all as soon as it changes. Writes don't change the
+    stop ID, so writes made through GALA (`Inferior.write_memory`, expressions
+    with side effects) bump `_memory_generation`, which drops the pages too.
+    Writes made behind GALA's back, like the `memory write` command, are not
+    seen until the process resumes or `gala_flush_memory_cache` is called.
+    Memory in core files never changes, so their caches are never dropped.
+    """
+
+    def __init__(self, sbprocess: lldb.SBProcess):
+        self._sbprocess = sbprocess
+        plugin_name = sbprocess.GetPluginName() or ''
+        self.persistent = 'core' in plugin_name or plugin_name == 'minidump'
+        if sbprocess.GetTarget().GetByteOrder() == lldb.eByteOrderBig:
+            self.byte_order = 'big'
+        else:
+            self.byte_order = 'little'
+        self._stop_id = None
+        self._pages: Dict[int, bytes] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def is_alive(self) -> bool:
+        return self._sbprocess.IsValid() and self._sbprocess.GetState() not in (
+            lldb.eStateInvalid, lldb.eStateExited, lldb.eStateDetached)
+
+    def flush(self) -> None:
+        self._pages.clear()
+
+    def _check_stop_id(self) -> None:
+        if self.persistent:
+            return
+        # Expression evaluation can run code in the inferior, so it counts as a
+        # stop too.
+        stop_id = (self._sbprocess.GetStopID(True), _memory_generation)
+        if stop_id != self._stop_id:
+            self._pages.clear()
+            self._stop_id = stop_id
+
+    def _read_uncached(self, address: int, length: int) -> bytes:
+        err = lldb.SBError()
+        result = self._sbprocess.ReadMemory(address, length, err)
+        if not err.Success() or result is None or len(result) != length:
+            raise error('Cannot access memory at address 0x%x' % address)
+        return result
+
+    def _fetch_pages(self, first_page: int, num_pages: int) -> None:
+        data = self._read_uncached(first_page * _MEMORY_PAGE_SIZE,
+                                   num_pages * _MEMORY_PAGE_SIZE)
+        for i in range(num_pages):
+            start = i * _MEMORY_PAGE_SIZE
+            self._pages[first_page + i] = data[start:start + _MEMORY_PAGE_SIZE]
+
+    def read(self, address: int, length: int) -> bytes:
+        """Reads `length` bytes at `address`, going through the cache."""
+        if length <= 0:
+            return b''
+        self._check_stop_id()
+        first_page = address // _MEMORY_PAGE_SIZE
+        last_page = (address + length - 1) // _MEMORY_PAGE_SIZE
+        num_pages = last_page - first_page + 1
+        if num_pages > _MAX_PAGES_PER_CACHED_READ:
+            self.misses += num_pages
+            return self._read_uncached(address, length)
+
+        if len(self._pages) + num_pages > _MAX_CACHED_PAGES:
+            self._pages.clear()
+        # Fetch runs of missing pages with a single read each.
+        run_start = None
+        for page in range(first_page, last_page + 2):
+            if page <= last_page and page not in self._pages:
+                self.misses += 1
+                if run_start is None:
+                    run_start = page
+                continue
+            if page <= last_page:
+                self.hits += 1
+            if run_start is not None:
+                try:
+                    self._fetch_pages(run_start, page - run_start)
+                except error:
+                    # Some page around the requested range is not readable.
+                    # The range itself still might be.
+                    return self._read_uncached(address, length)
+                run_start = None
+
+        offset = address - first_page * _MEMORY_PAGE_SIZE
+        if num_pages == 1:
+            return self._pages[first_page][offset:offset + length]
+        data = b''.join(self._pages[p] for p in range(first_page, last_page + 1))
+        return data[offset:offset + length]
+
+
+# Bumped whenever GALA writes to the memory of a process. Memory caches and stop
+# keys include it, so anything read before the write is dropped.
+_memory_generation = 0
+
+# Memory caches for each process, indexed by the process unique ID. The unique
+# ID changes when a process is restarted, so we never mix up the memory of two
+# different runs.
+_memory_caches: Dict[int, _MemoryCache] = {}
+
+
+def _memory_cache(sbprocess: lldb.SBProcess) -> Optional[_MemoryCache]:
+    """Returns the memory cache for `sbprocess`, or None if it's not valid."""
+    if not sbprocess or not sbprocess.IsValid():
+        return None
+    unique_id = sbprocess.GetUniqueID()
+    cache = _memory_caches.get(unique_id)
+    if cache is None:
+        # Take the chance to forget about processes that are gone.
+        for key in [k for k, c in _memory_caches.items() if not c.is_alive()]:
+            del _memory_caches[key]
+        cache = _MemoryCache(sbprocess)
+        _memory_caches[unique_id] = cache
+    return cache
+
+
+# Stop key of the current target's process while a printer callback is running.
+# See `_current_stop_key`.
+_callback_stop_key = None
+# Selected frame and its key while a printer callback is running. See
+# `_selected_frame`.
+_callback_frame: Optional[Tuple[Optional[lldb.SBFrame], Any]] = None
+
+
+def _current_stop_key() -> Optional[Tuple[int, int, int]]:
+    """Identifies the current stop of the current target's process.
+
+    The key is the process unique ID, its stop ID and `_memory_generation`.
+    Anything derived from the contents of values can be reused as long as the
+    key doesn't change. The process can't resume while a printer callback is
+    running, so in that case the key is only computed once per callback.
+    """
+    global _callback_stop_key
+    if _callback_stop_key is not None and current_target is not None:
+        return _callback_stop_key
+    sbprocess = gala_get_current_target().GetProcess()
+    if sbprocess.IsValid():
+        key = (sbprocess.GetUniqueID(), sbprocess.GetStopID(True),
+               _memory_generation)
+    else:
+        key = None
+    if current_target is not None:
+        _callback_stop_key = key
+    return key
+
+
+def gala_memory_cache_stats() -> Dict[str, int]:
+    """Returns hit/miss counters of the current process memory cache.
+
+    Counters are in pages. This is a GALA extension, useful to check how much
+    memory traffic the cache is saving while printing values.
+    """
+    cache = _memory_cache(gala_get_current_target().GetProcess())
+    if cache is None:
+        return {'hits': 0, 'misses': 0, 'cached_pages': 0}
+    return {'hits': cache.hits,
+            'misses': cache.misses,
+            'cached_pages': len(cache._pages)}
+
+
+def _memory_written() -> None:
+    """Drops everything read from memory after GALA wrote to it."""
+    global _memory_generation, _callback_stop_key
+    _memory_generation += 1
+    _callback_stop_key = None
+
+
+def gala_flush_memory_cache() -> None:
+    """Drops all cached memory. This is a GALA extension.
+
+    Call it after changing memory without resuming the process in ways GALA
+    doesn't see, like the `memory write` command.
+    """
+    _memory_written()
+    for cache in _memory_caches.values():
+        cache.flush()
+
+
+def _read_memory(address: int, length: int) -> bytes:
+    """Reads `length` bytes at `address` from the current target."""
+    target = gala_get_current_target()
+    cache = _memory_cache(target.GetProcess())
+    if cache is not None:
+        return cache.read(address, length)
+    # Without a process we can still read initialized data from the object
+    # files. There is nothing to cache in that case.
+    err = lldb.SBError()
+    result = target.ReadMemory(lldb.SBAddress(address, target), length, err)
+    if not err.Success() or result is None or len(result) != length:
+        raise error('Cannot access memory at address 0x%x' % address)
+    return result
+
+
+def _find_string_terminator(buf: bytes, char_size: int, start: int) -> int:
+    """Returns the offset of the first NUL character in `buf`, or -1.
+
+    Only offsets that are a multiple of `char_size` are considered, so a zero
+    byte inside a wide character isn't mistaken for the end of the string.
+    `start` must also be a multiple of `char_size`.
+    """
+    terminator = b'\0' * char_size
+    pos = buf.find(terminator, start)
+    while pos >= 0 and pos % char_size:
+        pos = buf.find(terminator, pos - pos % char_size + char_size)
+    return pos
+
+
+def _read_c_string(address: int,
+                   char_size: int,
+                   max_chars: Optional[int] = None) -> bytes:
+    """Reads a NUL-terminated string of `char_size`-byte characters.
+
+    Memory is fetched in page-aligned blocks, so a string ending right before
+    an unmapped page can still be read. If `max_chars` is given, at most that
+    many characters are returned even if no terminator has been found.
+    """
+    buf = bytearray()
+    max_bytes = None if max_chars is None else max_chars * char_size
+    # The first block only goes up to the next page boundary, so the following
+    # ones are all page-aligned.
+    chunk_size = _MEMORY_PAGE_SIZE - address % _MEMORY_PAGE_SIZE
+    search_start = 0
+    grow = True
+    while max_bytes is None or len(buf) < max_bytes:
+        size = chunk_size
+        if max_bytes is not None:
+            size = min(size, max_bytes - len(buf))
+        try:
+            buf += _read_memory(address + len(buf), size)
+        except error:
+            # A multi-page block can fail because of an unmapped page after
+            # the terminator. Retry one page at a time before giving up.
+            if chunk_size <= _MEMORY_PAGE_SIZE:
+                raise
+            chunk_size = _MEMORY_PAGE_SIZE
+            grow = False
+            continue
+        pos = _find_string_terminator(buf, char_size, search_start)
+        if pos >= 0:
+            del buf[pos:]
+            return bytes(buf)
+        # Resume at the first character we haven't fully seen yet.
+        search_start = len(buf) - len(buf) % char_size
+        if grow:
+            # Long strings get bigger blocks, always a whole number of pages.
+            pages = max(1, chunk_size // _MEMORY_PAGE_SIZE * 2)
+            chunk_size = min(_MAX_STRING_CHUNK_SIZE, pages * _MEMORY_PAGE_SIZE)
+    return bytes(buf)
+
+
+def _target_byte_order() -> str:
+    """Returns the byte order of the current target, as 'big' or 'little'."""
+    state = _target_state()
+    if state.byte_order is None:
+        if gala_get_current_target().GetByteOrder() == lldb.eByteOrderBig:
+            state.byte_order = 'big'
+        else:
+            state.byte_order = 'little'
+    return state.byte_order
+
+
+def gala_target_byte_order() -> str:
+    """Returns the byte order of the current target, as 'big' or 'little'.
+
+    This is a GALA extension.
+    """
+    return _target_byte_order()
+
+
+def _default_string_encoding(char_size: int) -> str:
+    """Returns the encoding gdb would assume for characters of this size."""
+    if char_size == 1:
+        return 'utf-8'
+    suffix = 'be' if _target_byte_order() == 'big' else 'le'
+    return 'utf-%d-%s' % (char_size * 8, suffix)
+
+
+def _sbvalue_from_integer(number: int, gdbtype: 'Type',
+                          name: Optional[str] = None) -> lldb.SBValue:
+    """Returns an `SBValue` of integer, enum or pointer type holding `number`.
+
+    `number` is truncated to the size of `gdbtype`, like a C conversion.
+    """
+    target = gala_get_current_target()
+    size = gdbtype.strip_typedefs().sizeof
+    contents = (number & ((1 << (8 * size)) - 1)).to_bytes(
+        size, _target_byte_order())
+    data = lldb.SBData()
+    err = lldb.SBError()
+    data.SetDataWithOwnership(err, contents, target.GetByteOrder(),
+                              target.addr_size)
+    return target.CreateValueFromData(name or 'value', data, gdbtype.sbtype())
+
+
+def _gdbvalue_from_integer(number: int, gdbtype: 'Type',
+                           name: Optional[str] = None) -> 'Value':
+    """Returns a value of integer or enum type `gdbtype` holding `number`."""
+    result = Value(_sbvalue_from_integer(number, gdbtype, name))
+    result._type = gdbtype
+    return result
+
+
+def _get_child_member_with_field(
+        sbvalue: lldb.SBValue, field: Field) -> Optional[lldb.SBValue]:
+    """Returns the member of `sbvalue` described by `field`.
+
+    This uses the precomputed field layout instead of a lookup by name, so
+    it only handles fields of the value's own type that are plain members at
+    a fixed offset, including anonymous members. Returns None for anything
+    else (bitfields, base classes, fields from some other type), and the
+    caller should look up the member by name instead.
+    """
+    if (field.is_base_class or field.bitsize or
+        not hasattr(field, 'bitpos') or field.type is None):
+        return None
+    value_type = Type(sbvalue.GetType(),
+                      _target_state(sbvalue.GetTarget())).strip_typedefs()
+    if field.parent_type.strip_typedefs() is not value_type:
+        return None
+    return sbvalue.CreateChildAtOffset(
+        field.name or '', field.bitpos // 8, field.type.sbtype())
+
+
 def _gdbvalue_from_number(number: Union[int, float]) -> 'Value':
+    return Value(number)
+
+
+def _sbvalue_from_number(number: Union[int, float]) -> lldb.SBValue:
     data = lldb.SBData()
     if isinstance(number, int):
         if number < 0:
@@ -425,9 +1681,9 @@ def _gdbvalue_from_number(number: Union[int, float]) -> 'Value':
         data.SetDataFromDoubleArray([number])
         result_type = get_builtin_sbtype('double')
     else:
-        raise TypeError('_gdbvalue_from_number requires a number.')
-    return Value(gala_get_current_target().CreateValueFromData(
-        'value', data, result_type))
+        raise TypeError('_sbvalue_from_number requires a number.')
+    return gala_get_current_target().CreateValueFromData(
+        'value', data, result_type)
 
 
 class Value(object):
@@ -446,14 +1702,29 @@ class Value(object):
             v: Any,
             t: Optional[Type] = None,
     ):
+        self._init_caches()
         if t is None:
             # Single-argument form.
+            if isinstance(v, LazyString):
+                v = v.value()
             if isinstance(v, lldb.SBValue):
                 self._sbvalue_object = v.GetNonSyntheticValue()
             elif isinstance(v, Value):
-                self._sbvalue_object = v._sbvalue_object
-            elif isinstance(v, (int, float)):
-                self._sbvalue_object = _gdbvalue_from_number(v).sbvalue()
+                if v._has_sbvalue():
+                    self._sbvalue_object = v._sbvalue_object
+                self._scalar = v._scalar
+                self._address = v._address
+                self._bitfield = v._bitfield
+                self._type = v._type
+                self._get_sbvalue = v._get_sbvalue
+            elif isinstance(v, int):
+                # `long`, like the `SBValue` we would create for it. Booleans
+                # are stored as plain ints, so they print as numbers.
+                self._scalar = int(v)
+                self._type = _builtin_type('long')
+            elif isinstance(v, float):
+                self._scalar = v
+                self._type = _builtin_type('double')
             elif isinstance(v, (bool, str)):
                 raise NotImplementedError(
                         "gdb.Value(%s) not supported yet by GALA" % type(v))
@@ -471,49 +1742,157 @@ class Value(object):
             self._sbvalue_object = target.CreateValueFromData(
                     'value', data, t.sbtype())
 
+    @classmethod
+    def _without_sbvalue(cls,
+                         gdbtype: Type,
+                         scalar: Optional[Union[int, float]] = None,
+                         address: Optional[int] = None,
+                         get_sbvalue: Optional[
+                             Callable[[], Optional[lldb.SBValue]]] = None
+                         ) -> 'Value':
+        """Returns a value whose `SBValue` is only created when needed.
+
+        Either `scalar` (the contents of the value) or `address` (where the
+        contents are) must be given. Values created from an address are lazy:
+        nothing is read until the contents are needed.
+
+        If given, `get_sbvalue` creates the `SBValue`, so that it gets the
+        name and dynamic type lldb would give it (e.g. for members).
+        Otherwise an unnamed one is created from `scalar` or `address`.
+        """
+        self = cls.__new__(cls)
+        self._init_caches()
+        self._type = gdbtype
+        self._scalar = scalar
+        self._address = address
+        self._get_sbvalue = get_sbvalue
+        return self
+
+    def _init_caches(self) -> None:
+        # Address of the contents of this value, when GALA itself created the
+        # value from a known address. Lets us read the contents through the
+        # memory cache instead of asking lldb.
+        self._address = None
+        # The `Type` of this value, computed on first use.
+        self._type = None
+        # Children returned by `__getitem__`, keyed by subscript. Only valid
+        # while the process stays stopped at `_children_stop_key`.
+        self._children: Dict[Union[str, int, Field], 'Value'] = {}
+        self._children_stop_key = None
+        # Python number held by values created from a number or computed by
+        # GALA (e.g. pointer arithmetic). Those values don't create their
+        # `SBValue` until someone needs it, see `__getattr__`.
+        self._scalar = None
+        # (bit offset from `_address`, bit size) for bitfield members whose
+        # address we know.
+        self._bitfield = None
+        # The last number returned by `_as_number`, and the stop it was read
+        # in.
+        self._number = None
+        self._number_stop_key = None
+        # Set by `fetch_lazy`.
+        self._fetched = False
+        # Creates the `SBValue` of values made by `_without_sbvalue`, if the
+        # default one is not good enough. See `_create_sbvalue`.
+        self._get_sbvalue = None
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for missing attributes: create the `SBValue` of values
+        # made by `_without_sbvalue` the first time it's needed.
+        if name == '_sbvalue_object' and '_type' in self.__dict__:
+            self._sbvalue_object = self._create_sbvalue().GetNonSyntheticValue()
+            return self._sbvalue_object
+        raise AttributeError("'%s' object has no attribute '%s'" %
+                             (type(self).__name__, name))
+
+    def _has_sbvalue(self) -> bool:
+        return '_sbvalue_object' in self.__dict__
+
+    def _create_sbvalue(self) -> lldb.SBValue:
+        if self._get_sbvalue is not None:
+            sbvalue = self._get_sbvalue()
+            if sbvalue is not None and sbvalue.IsValid():
+                return sbvalue
+        if self._scalar is not None:
+            if isinstance(self._scalar, float) or self._type is _builtin_type(
+                    'long'):
+                return _sbvalue_from_number(self._scalar)
+            return _sbvalue_from_integer(self._scalar, self._type)
+        if self._address is None:
+            raise error('Cannot create a value of type "%s".' % self._type)
+        target = gala_get_current_target()
+        return target.CreateValueFromAddress(
+            '', lldb.SBAddress(self._address, target), self._type.sbtype())
+
+    @property
+    def is_lazy(self) -> bool:
+        """True if the contents of this value haven't been read yet."""
+        return (not self._has_sbvalue() and self._scalar is None and
+                self._number is None and not self._fetched)
+
+    def fetch_lazy(self) -> None:
+        """Reads the contents of a lazy value. Does nothing otherwise."""
+        if self.is_lazy:
+            _read_memory(self._address, self.type.sizeof)
+            self._fetched = True
+
     def sbvalue(self) -> lldb.SBValue:
         return self._sbvalue_object
 
     def _stripped_sbtype(self) -> Tuple[lldb.SBType, int]:
-        sbtype = self._sbvalue_object.GetType()
-        stripped_sbtype = Type(sbtype).strip_typedefs().sbtype()
-        type_class = stripped_sbtype.GetTypeClass()
-        return stripped_sbtype, type_class
+        stripped_type = self.type.strip_typedefs()
+        return stripped_type.sbtype(), stripped_type._get_type_class()
 
     def _as_number(self) -> Union[int, float]:
-        sbtype, _ = self._stripped_sbtype()
-        type_flags = sbtype.GetTypeFlags()
-        if self._sbvalue_object.GetError().Fail():
-            raise error("%s" % self._sbvalue_object.GetError())
-        if type_flags & lldb.eTypeIsEnumeration:
-            sbtype = sbtype.GetEnumerationIntegerType().GetCanonicalType()
-            type_flags = sbtype.GetTypeFlags()
-        if type_flags & lldb.eTypeIsPointer or type_flags & lldb.eTypeIsInteger:
-            if type_flags & lldb.eTypeIsSigned:
-                numval = self._sbvalue_object.GetValueAsSigned()
-            else:
-                numval = self._sbvalue_object.GetValueAsUnsigned()
-        elif type_flags & lldb.eTypeIsFloat:
-            basic_type = sbtype.GetBasicType()
-            err = lldb.SBError()
-            if basic_type == lldb.eBasicTypeFloat:
-                numval = self._sbvalue_object.GetData().GetFloat(err, 0)
-            elif basic_type == lldb.eBasicTypeDouble:
-                numval = self._sbvalue_object.GetData().GetDouble(err, 0)
-            elif basic_type == lldb.eBasicTypeLongDouble:
-                numval = self._sbvalue_object.GetData().GetLongDouble(err, 0)
+        if self._scalar is not None:
+            return self._scalar
+        # Printers convert the same value many times (`int()`, comparisons,
+        # `str()` of enums...), so remember the number until the next stop.
+        stop_key = _current_stop_key()
+        if self._number is not None and self._number_stop_key == stop_key:
+            return self._number
+        number = self._read_number()
+        self._number = number
+        self._number_stop_key = stop_key
+        return number
+
+    def _read_number(self) -> Union[int, float]:
+        descriptor = self.type._get_scalar_descriptor()
+        if descriptor.kind == _SCALAR_ARRAY:
+            if not self._has_sbvalue() and self._address is not None:
+                return self._address
+            if self._sbvalue_object.GetError().Fail():
+                raise error("%s" % self._sbvalue_object.GetError())
+            return self._sbvalue_object.GetLoadAddress()
+        if self._address is not None:
+            cache = _memory_cache(gala_get_current_target().GetProcess())
+            if cache is not None:
+                size = descriptor.size
+                if self._bitfield is not None:
+                    bit_offset, bitsize = self._bitfield
+                    size = (bit_offset + bitsize + 7) // 8
+                return descriptor.decode(cache.read(self._address, size),
+                                         self._bitfield)
+        sbvalue = self._sbvalue_object
+        err = lldb.SBError()
+        if descriptor.kind == _SCALAR_INT:
+            # lldb knows whether the value is a bitfield, we don't.
+            if descriptor.signed:
+                number = sbvalue.GetValueAsSigned(err, 0)
             else:
-                raise RuntimeError('Unknown float type %s.' % sbtype.name)
-            if not err.Success():
-                raise RuntimeError(
-                    'Could not convert float type value to a number:\n%s' %
-                    err.GetCString())
-        elif type_flags & lldb.eTypeIsArray:
-            numval = self._sbvalue_object.GetLoadAddress()
-        else:
-            raise TypeError(
-                'Conversion of type %s to number is not supported.'%sbtype.name)
-        return numval
+                number = sbvalue.GetValueAsUnsigned(err, 0)
+            if err.Fail():
+                raise error("%s" % (sbvalue.GetError() if
+                                    sbvalue.GetError().Fail() else err))
+            return number
+        if sbvalue.GetError().Fail():
+            raise error("%s" % sbvalue.GetError())
+        data = sbvalue.GetData().ReadRawData(err, 0, descriptor.size)
+        if not err.Success() or data is None:
+            raise RuntimeError(
+                'Could not convert float type value to a number:\n%s' %
+                err.GetCString())
+        return descriptor.decode(data)
 
     def _binary_op(self,
                    other: Union['Value', int, float],
@@ -526,11 +1905,11 @@ class Value(object):
                     'Invalid binary operation on/with pointer value.')
         if isinstance(other, int):
             other_val = other
-            other_sbtype = get_builtin_sbtype('long')
+            other_sbtype = _builtin_type('long').sbtype()
             other_type_class = lldb.eTypeClassBuiltin
         elif isinstance(other, float):
             other_val = other
-            other_sbtype = get_builtin_sbtype('double')
+            other_sbtype = _builtin_type('double').sbtype()
             other_type_class = lldb.eTypeClassBuiltin
         elif isinstance(other, Value):
             other_sbtype, other_type_class = other._stripped_sbtype()
@@ -550,13 +1929,10 @@ class Value(object):
             res = self._as_number() ^ other_val
         elif op == OP_ADD:
             if type_class == lldb.eTypeClassPointer:
-                addr = self._sbvalue_object.GetValueAsUnsigned()
-                new_addr = (addr +
-                            other_val * sbtype.GetPointeeType().GetByteSize())
-                new_sbvalue = self._sbvalue_object.CreateValueFromAddress(
-                    '', new_addr, sbtype.GetPointeeType())
-                return Value(new_sbvalue.AddressOf().Cast(
-                    self._sbvalue_object.GetType()))
+                addr = self._as_number()
+                new_addr = (addr + other_val *
+                            self.type.strip_typedefs().target().sizeof)
+                return Value._without_sbvalue(self.type, scalar=new_addr)
             else:
                 res = self._as_number() + other_val
         elif op == OP_SUB:
@@ -619,19 +1995,21 @@ class Value(object):
             return 1
 
     def __str__(self) -> str:
+        # Floats need the SBValue, so they are formatted by lldb like any other
+        # double.
+        if isinstance(self._scalar, int):
+            if self._type is _builtin_type('long'):
+                return str(self._scalar)
+            if self.type.strip_typedefs()._get_type_flags() & lldb.eTypeIsPointer:
+                return "0x%x" % self._scalar
         if not self._sbvalue_object.GetError().Success():
             raise error("%s" % self._sbvalue_object.GetError())
         # For values of enum types we need to check if the value is one of the
         # enumerators in order to return a properly-formatted name. However, if
         # it's any other random integer value we just print the number.
         t = self._sbvalue_object.GetType()
-        if t.GetTypeClass() == lldb.eTypeClassEnumeration:
-            enum_list = t.GetEnumMembers()
-            for i in range(enum_list.GetSize()):
-                e = enum_list.GetTypeEnumMemberAtIndex(i)
-                if self._as_number() == e.GetValueAsSigned():
-                    return _format_enum_value_name(t, e.GetName())
-            return str(self._as_number())
+        if self.type._get_type_class() == lldb.eTypeClassEnumeration:
+            return self.type._format_enum_value(self._as_number())
 
         # For pointers, make sure we always print the numeric value.
         # TODO: print a summary of what the pointer points to (for example,
@@ -667,39 +2045,101 @@ class Value(object):
         return float(self._as_number())
 
     def __getitem__(self, index: Union['Value', Field, int, str]) -> 'Value':
-        sbvalue = self._sbvalue_object
-        # Check if we need to use a different `sbvalue`:
+        # Printers often subscript the same value many times, for example from
+        # both `to_string` and `children`, so remember the children we return.
+        if not isinstance(index, (str, int, Field)):
+            return self._getitem_uncached(index)
+        stop_key = _current_stop_key()
+        if stop_key != self._children_stop_key:
+            self._children.clear()
+            self._children_stop_key = stop_key
+        child = self._children.get(index)
+        if child is None:
+            child = self._getitem_uncached(index)
+            if len(self._children) >= _MAX_CACHED_CHILDREN:
+                self._children.clear()
+            self._children[index] = child
+        return child
+
+    def _getitem_uncached(
+            self, index: Union['Value', Field, int, str]) -> 'Value':
+        value_type = self.type.strip_typedefs()
+        value_type_class = value_type._get_type_class()
+        # The value to get the member from, as a function so that we only
+        # create `SBValue`s when we can't avoid them.
+        get_sbvalue = lambda: self._sbvalue_object
+        # Address of the value, if we know it without asking lldb.
+        base_address = self._address
+        # Check if we need to use a different value:
         # - If ptr["member name"], we need to dereference the pointer.
         # - If array["member name"], decay to pointer and dereference.
-        canonical_type = sbvalue.GetType().GetCanonicalType()
-        if ((canonical_type.IsPointerType() or canonical_type.IsReferenceType())
-            and isinstance(index, str)):
-            sbvalue = sbvalue.Dereference()
-        elif (canonical_type.GetTypeClass() == lldb.eTypeClassArray
-              and isinstance(index, str)):
-            sbvalue = sbvalue.GetChildAtIndex(0)
-
-        # Now we have the right `sbvalue`, check its type and compute the child
+        if isinstance(index, str):
+            if value_type_class == lldb.eTypeClassPointer:
+                value_type = value_type.target().strip_typedefs()
+                get_sbvalue = lambda: self._sbvalue_object.Dereference()
+                base_address = self._as_number()
+            elif value_type_class == lldb.eTypeClassReference:
+                value_type = value_type.target().strip_typedefs()
+                get_sbvalue = lambda: self._sbvalue_object.Dereference()
+                base_address = None
+            elif value_type_class == lldb.eTypeClassArray:
+                value_type = value_type.target().strip_typedefs()
+                get_sbvalue = lambda: self._sbvalue_object.GetChildAtIndex(0)
+            value_type_class = value_type._get_type_class()
+
+        # Now we have the right value, check its type and compute the child
         # value accordingly.
-        sbtype, type_class = Value(sbvalue)._stripped_sbtype()
-        if (type_class == lldb.eTypeClassClass or
-            type_class == lldb.eTypeClassStruct or
-            type_class == lldb.eTypeClassUnion):
+        if (value_type_class == lldb.eTypeClassClass or
+            value_type_class == lldb.eTypeClassStruct or
+            value_type_class == lldb.eTypeClassUnion):
             # gdb also allows using a gdb.Field as a struct index.
             if isinstance(index, Field):
+                if (base_address is not None and not index.is_base_class and
+                    not index.bitsize and
+                    hasattr(index, 'bitpos') and index.type is not None and
+                    index.parent_type.strip_typedefs() is value_type):
+                    return Value._without_sbvalue(
+                        index.type, address=base_address + index.bitpos // 8,
+                        get_sbvalue=lambda: _get_child_member_with_field(
+                            get_sbvalue(), index))
+                member_sbvalue = _get_child_member_with_field(
+                    get_sbvalue(), index)
+                if member_sbvalue is not None:
+                    return Value(member_sbvalue)
+                if not index.name:
+                    raise error('Anonymous field of type "%s" is not a member '
+                                'of type "%s".' % (index.parent_type,
+                                                   value_type))
                 index = index.name
 
             if not isinstance(index, str):
                 raise error('Key value used to subscript a '
                             'class/struct/union value is not a string.')
-            member_sbvalue = _get_child_member_with_name(
-                sbvalue.GetNonSyntheticValue(), index)
+            location = value_type._get_member_index().get(index)
+            if location is not None and not location.bitsize:
+                # lldb can't create bitfield children at an offset, so those
+                # are looked up by name below.
+                get_member_sbvalue = lambda: get_sbvalue(
+                    ).GetNonSyntheticValue().CreateChildAtOffset(
+                        index, location.offset, location.type.sbtype())
+                if base_address is not None:
+                    return Value._without_sbvalue(
+                        location.type, address=base_address + location.offset,
+                        get_sbvalue=get_member_sbvalue)
+                member_sbvalue = get_member_sbvalue()
+            else:
+                member_sbvalue = _get_child_member_with_name(
+                    get_sbvalue().GetNonSyntheticValue(), index)
 
             if not member_sbvalue.IsValid():
                 raise error(
                     'No member with name "%s" in value of type "%s".' %
                     (index, self.sbvalue().GetType()))
-            return Value(member_sbvalue)
+            result = Value(member_sbvalue)
+            if base_address is not None and location is not None:
+                result._address = base_address + location.bitpos // 8
+                result._bitfield = (location.bitpos % 8, location.bitsize)
+            return result
 
         # Not a struct/class/union.
         if isinstance(index, str):
@@ -713,25 +2153,27 @@ class Value(object):
           except:
             raise error("Value can't be converted to integer.")
 
-        if type_class == lldb.eTypeClassArray:
-            addr = sbvalue.GetLoadAddress()
+        if value_type_class == lldb.eTypeClassArray:
+            addr = self._address
+            if addr is None:
+                addr = self._sbvalue_object.GetLoadAddress()
             # Treating the array as a pointer works better in some cases (for
             # example, if the original code used the "struct hack" and lldb
             # believes the array has size 0). However, if we don't have a live
             # process we might still be able to get the value if the array is a
             # global, so try that.
             if addr == lldb.LLDB_INVALID_ADDRESS:
-                return Value(sbvalue.GetChildAtIndex(index))
-            elem_sbtype = sbtype.GetArrayElementType()
-        elif type_class == lldb.eTypeClassPointer:
-            addr = sbvalue.GetValueAsUnsigned()
-            elem_sbtype = sbtype.GetPointeeType()
+                return Value(self._sbvalue_object.GetChildAtIndex(index))
+        elif value_type_class == lldb.eTypeClassPointer:
+            addr = self._as_number()
         else:
             raise error('Cannot subscript something of type `%s`.' %
                         str(self.sbvalue().GetType()))
-        new_addr = addr + index * elem_sbtype.GetByteSize()
-        return Value(self._sbvalue_object.CreateValueFromAddress(
-             "", new_addr, elem_sbtype))
+        elem_type = value_type.target()
+        # Nothing is read until the contents of the element are needed, so
+        # indexing into huge arrays is cheap.
+        return Value._without_sbvalue(
+            elem_type, address=addr + index * elem_type.sizeof)
 
     def __add__(self, number: Union['Value', int, float]) -> 'Value':
         return self._binary_op(number, OP_ADD)
@@ -826,10 +2268,18 @@ class Value(object):
 
     @property
     def type(self) -> Type:
-        return Type(self._sbvalue_object.GetType())
+        if self._type is None:
+            sbvalue = self._sbvalue_object
+            self._type = Type(sbvalue.GetType(),
+                              _target_state(sbvalue.GetTarget()))
+        return self._type
 
     @property
     def address(self) -> 'Value':
+        if (self._address is not None and self._bitfield is None and
+            self.type.strip_typedefs().code != TYPE_CODE_REF):
+            return Value._without_sbvalue(self.type.pointer(),
+                                          scalar=self._address)
         # in gdb, the address property of a T& gdb.Value returns the address of
         # the pointed-to T object, not the address of the reference itself.
         sbvalue = self._sbvalue_object
@@ -845,23 +2295,36 @@ class Value(object):
 
     def cast(self, gdbtype: Type) -> 'Value':
         target_sbtype = gdbtype.sbtype()
-        self_sbtype = self._sbvalue_object.GetType()
-        is_baseclass, offset = Type(self_sbtype)._is_baseclass(target_sbtype)
-        if is_baseclass:
+        offset = self.type._base_class_offset(gdbtype)
+        if offset is not None and self._address is not None:
+            return Value._without_sbvalue(gdbtype,
+                                          address=self._address + offset)
+        if offset is not None:
             return Value(self._sbvalue_object.CreateChildAtOffset(
                 self._sbvalue_object.GetName(), offset, target_sbtype))
         # SBValue::Cast doesn't work correctly when casting an integer value to
         # a larger type (for example, char -> int). Performing such a cast
-        # results in a garbage value from reading adjacent memory.
+        # results in a garbage value from reading adjacent memory. Narrowing
+        # casts would read the wrong bytes on big endian targets.
         #
         # Some prettyprinters do this kind of cast to prevent the debugger from
-        # printing as 'A' an uint8_t variable known to be used as a number.
-        if (self_sbtype.GetTypeFlags() & lldb.eTypeIsInteger and
-            target_sbtype.GetTypeFlags() & lldb.eTypeIsInteger and
-            self_sbtype.GetByteSize() < target_sbtype.GetByteSize()):
-            result = gala_get_current_target().CreateValueFromExpression(
-                self._sbvalue_object.GetName(), str(self._as_number()))
-            return Value(result)
+        # printing as 'A' an uint8_t variable known to be used as a number, so
+        # compute the converted value ourselves instead of going through the
+        # expression evaluator.
+        #
+        # Conversions to bool also need to be done here: truncating would make
+        # multiples of 256 false, but any nonzero value converts to true.
+        is_bool = gdbtype.strip_typedefs().code == TYPE_CODE_BOOL
+        if (self.type._is_integral() and gdbtype._is_integral() and
+            (is_bool or self.type.strip_typedefs().sizeof !=
+             gdbtype.strip_typedefs().sizeof)):
+            name = None
+            if self._has_sbvalue():
+                name = self._sbvalue_object.GetName()
+            number = int(self._as_number())
+            if is_bool:
+                number = int(number != 0)
+            return _gdbvalue_from_integer(number, gdbtype, name)
         return Value(self._sbvalue_object.Cast(target_sbtype))
 
     def reinterpret_cast(self, gdbtype: Type) -> 'Value':
@@ -870,6 +2333,16 @@ class Value(object):
         return Value(self._sbvalue_object.Cast(gdbtype.sbtype()))
 
     def dereference(self) -> 'Value':
+        if not self._has_sbvalue():
+            # Stay lazy if we don't have an SBValue yet.
+            stripped = self.type.strip_typedefs()
+            if stripped.code == TYPE_CODE_PTR and stripped.target().code not in (
+                    TYPE_CODE_VOID, TYPE_CODE_FUNC):
+                return Value._without_sbvalue(stripped.target(),
+                                              address=self._as_number())
+            if stripped.code == TYPE_CODE_ARRAY and self._address is not None:
+                return Value._without_sbvalue(stripped.target(),
+                                              address=self._address)
         stripped_sbtype, _ = self._stripped_sbtype()
         stripped_sbval = self._sbvalue_object.Cast(stripped_sbtype)
         # gdb allows calling dereference() on arrays, and it's supposed to be
@@ -881,36 +2354,592 @@ class Value(object):
     def referenced_value(self) -> 'Value':
         return Value(self._sbvalue_object.Dereference())
 
+    def to_numpy(self, count: Optional[int] = None) -> Any:
+        """Returns the elements of an array or pointer value. GALA extension.
+
+        All `count` elements are read with a single memory read. `count`
+        defaults to the length of arrays, and is required for pointers. The
+        elements must be integers, bools, enums, pointers, floats or doubles.
+
+        Returns a NumPy array, or an `array.array` if NumPy isn't installed.
+        """
+        stripped = self.type.strip_typedefs()
+        if stripped.code == TYPE_CODE_ARRAY:
+            element_type = stripped.target()
+            if count is None:
+                element_size = element_type.sizeof
+                count = stripped.sizeof // element_size if element_size else 0
+            address = self._address
+            if address is None:
+                address = self._sbvalue_object.GetLoadAddress()
+        elif stripped.code == TYPE_CODE_PTR:
+            if count is None:
+                raise ValueError('count is required for pointer values.')
+            element_type = stripped.target()
+            address = int(self._as_number())
+        else:
+            raise TypeError('Value of type "%s" is not an array or pointer.' %
+                            self.type)
+        if count < 0:
+            raise ValueError("count argument can't be negative.")
+        length = count * element_type.sizeof
+        if length == 0:
+            contents = b''
+        elif address == lldb.LLDB_INVALID_ADDRESS:
+            # Arrays that don't live in memory (e.g. values created from data)
+            # still have their contents available in the SBValue.
+            err = lldb.SBError()
+            data = self._sbvalue_object.GetData()
+            contents = data.ReadRawData(err, 0, data.GetByteSize()) or b''
+            contents = contents[:length]
+        else:
+            contents = _read_memory(address, length)
+        return _array_from_bytes(contents, element_type)
+
     def string(self,
-               encoding: str = 'utf-8',
+               encoding: Optional[str] = None,
                errors: str = 'strict',
                length: Optional[int] = None) -> str:
         """Returns this value as a string.
 
-        If `length` is not given, bytes will be fetched from memory until a null
-        byte is found. The `encoding` and `errors` arguments are passed directly
-        to `bytes.decode()` to convert bytes read from memory to the final
-        result string.
+        If `length` is not given, characters will be fetched from memory until a
+        null character is found (or until the end of the array, for array
+        values). The size of each character is taken from the pointee or element
+        type, so `wchar_t`, `char16_t` and `char32_t` strings work as well.
+
+        The `encoding` and `errors` arguments are passed directly to
+        `bytes.decode()` to convert bytes read from memory to the final result
+        string. If no encoding is given, UTF-8 is used for narrow strings and
+        UTF-16/UTF-32 in target byte order for wide ones.
         """
         if length is not None and length < 0:
             raise ValueError("length argument can't be negative.")
-        target = gala_get_current_target()
-        sberr = lldb.SBError()
-        result_bytes = b''
-        num_bytes_read = 0
-        while True:
-            if length is not None and num_bytes_read == length:
-                break
-            sbaddr = lldb.SBAddress(
-                self._sbvalue_object.GetValueAsUnsigned() + num_bytes_read,
-                target)
-            byte = target.ReadMemory(sbaddr, 1, sberr)
-            num_bytes_read += 1
-            if length is None and byte == b'\0':
-                break
-            result_bytes += byte
+        sbtype, type_class = self._stripped_sbtype()
+        max_chars = None
+        if type_class == lldb.eTypeClassArray:
+            char_sbtype = sbtype.GetArrayElementType()
+            address = self._address
+            if address is None:
+                address = self._sbvalue_object.GetLoadAddress()
+        else:
+            char_sbtype = sbtype.GetPointeeType()
+            address = int(self._as_number())
+        char_size = char_sbtype.GetCanonicalType().GetByteSize()
+        if char_size not in (1, 2, 4):
+            char_size = 1
+        if type_class == lldb.eTypeClassArray:
+            max_chars = sbtype.GetByteSize() // char_size
+
+        if encoding is None:
+            encoding = _default_string_encoding(char_size)
+
+        if (type_class == lldb.eTypeClassArray and
+            address == lldb.LLDB_INVALID_ADDRESS):
+            # Arrays that don't live in memory (e.g. values created from data)
+            # still have their contents available in the SBValue.
+            err = lldb.SBError()
+            data = self._sbvalue_object.GetData()
+            contents = data.ReadRawData(err, 0, data.GetByteSize()) or b''
+            if length is not None:
+                contents = contents[:length * char_size]
+            else:
+                end = _find_string_terminator(contents, char_size, 0)
+                if end >= 0:
+                    contents = contents[:end]
+            return contents.decode(encoding, errors)
+
+        if length is not None:
+            if length == 0:
+                return ''
+            result_bytes = _read_memory(address, length * char_size)
+        else:
+            result_bytes = _read_c_string(address, char_size, max_chars)
         return result_bytes.decode(encoding, errors)
 
+    def lazy_string(self,
+                    encoding: Optional[str] = None,
+                    length: int = -1) -> 'LazyString':
+        """Returns a `LazyString` for this value. Nothing is read from memory.
+
+        Pointers give a string starting at the pointed-to address, arrays a
+        string starting at the array. A `length` of -1 means the string is
+        NUL-terminated, except for arrays, where it defaults to the length of
+        the array.
+        """
+        if length < -1:
+            raise ValueError('Invalid length.')
+        stripped = self.type.strip_typedefs()
+        if stripped.code == TYPE_CODE_ARRAY:
+            address = self._address
+            if address is None:
+                address = self._sbvalue_object.GetLoadAddress()
+            char_size = stripped.target().sizeof
+            array_length = stripped.sizeof // char_size if char_size else 0
+            if length == -1:
+                length = array_length
+            elif length > array_length:
+                raise ValueError('Length is larger than array size.')
+        elif stripped.code == TYPE_CODE_PTR:
+            address = int(self._as_number())
+        else:
+            address = int(self.address)
+        if address == 0 and length > 0:
+            raise error('Cannot create a lazy string with address 0x0, and a '
+                        'non-zero length.')
+        return LazyString(address, length, encoding, self.type)
+
+    def format_string(self,
+                      *,
+                      raw: bool = False,
+                      pretty_arrays: bool = False,
+                      pretty_structs: Optional[bool] = None,
+                      array_indexes: bool = False,
+                      symbols: bool = True,
+                      unions: bool = True,
+                      address: bool = True,
+                      deref_refs: bool = False,
+                      actual_objects: bool = False,
+                      static_members: bool = True,
+                      max_elements: Optional[int] = None,
+                      max_depth: Optional[int] = None,
+                      repeat_threshold: Optional[int] = None,
+                      format: Optional[str] = None,
+                      styling: bool = False,
+                      summary: bool = False,
+                      nibbles: bool = False) -> str:
+        """Formats this value like gdb's `print` command.
+
+        Arrays are read in bulk, and runs of more than `repeat_threshold`
+        elements with identical bytes are printed once, as
+        `0 <repeats 1000 times>`. At most `max_elements` elements are printed,
+        and aggregates nested more than `max_depth` levels are printed as
+        `{...}`. The defaults for these three come from the matching gdb
+        parameters. A value of 0 for `max_elements` and `repeat_threshold`, or
+        -1 for `max_depth`, means no limit.
+
+        Unless `raw` is set, structs with lldb formatters (including GALA
+        printers) are formatted by lldb. `pretty_arrays`, `symbols`, `address`,
+        `deref_refs`, `actual_objects`, `static_members`, `styling` and
+        `nibbles` are accepted for compatibility, but have no effect.
+        """
+        if max_elements is None:
+            max_elements = parameter('print elements')
+            if max_elements is None:
+                max_elements = _DEFAULT_MAX_ELEMENTS
+        if max_depth is None:
+            max_depth = parameter('print max-depth')
+            if max_depth is None:
+                max_depth = _DEFAULT_MAX_DEPTH
+        if repeat_threshold is None:
+            repeat_threshold = parameter('print repeats')
+        if pretty_structs is None:
+            pretty_structs = parameter('print pretty')
+        if format is not None and format not in _INTEGER_FORMATS:
+            raise ValueError('Invalid format: %s' % format)
+        formatter = _ValueFormatter(
+            raw=raw,
+            pretty_structs=pretty_structs,
+            array_indexes=array_indexes,
+            unions=unions,
+            max_elements=max_elements,
+            max_depth=max_depth,
+            repeat_threshold=repeat_threshold,
+            format=format,
+            summary=summary)
+        return formatter.format(self, 0)
+
+
+# lldb's default for 'target.max-string-summary-length', in case it can't be
+# read.
+_DEFAULT_MAX_STRING_SUMMARY_LENGTH = 1024
+
+
+class LazyString(object):
+    """A string in inferior memory that is only read when printed.
+
+    Pretty printers can return a `LazyString` from `to_string()` to avoid
+    reading long strings that won't be printed in full anyway: GALA reads at
+    most 'target.max-string-summary-length' characters of it when rendering the
+    summary.
+    """
+
+    def __init__(self, address: int, length: int, encoding: Optional[str],
+                 type: Type):
+        self._address = address
+        self._length = length
+        self._encoding = encoding
+        self._type = type
+
+    @property
+    def address(self) -> int:
+        return self._address
+
+    @property
+    def length(self) -> int:
+        return self._length
+
+    @property
+    def encoding(self) -> Optional[str]:
+        return self._encoding
+
+    @property
+    def type(self) -> Type:
+        return self._type
+
+    def value(self) -> Value:
+        """Returns a `Value` of our pointer or array type for this string."""
+        if self._address == 0:
+            raise error('Cannot create a value from NULL.')
+        if self._type.strip_typedefs().code == TYPE_CODE_PTR:
+            return Value._without_sbvalue(self._type, scalar=self._address)
+        return Value._without_sbvalue(self._type, address=self._address)
+
+    def _char_size(self) -> int:
+        stripped = self._type.strip_typedefs()
+        if stripped.code in (TYPE_CODE_PTR, TYPE_CODE_ARRAY):
+            char_size = stripped.target().sizeof
+            if char_size in (1, 2, 4):
+                return char_size
+        return 1
+
+    def _fetch(self, max_chars: Optional[int]) -> Tuple[str, bool]:
+        """Reads up to `max_chars` characters of the string.
+
+        Returns the decoded string, and whether it was cut at `max_chars`.
+        """
+        char_size = self._char_size()
+        if self._length >= 0:
+            count = self._length
+            if max_chars is not None:
+                count = min(count, max_chars)
+            contents = _read_memory(self._address, count * char_size)
+            # Like lldb, stop at the first NUL character.
+            end = _find_string_terminator(contents, char_size, 0)
+            if end >= 0:
+                contents = contents[:end]
+                truncated = False
+            else:
+                truncated = count < self._length
+        else:
+            # Read one more character to know whether there are more.
+            limit = None if max_chars is None else max_chars + 1
+            contents = _read_c_string(self._address, char_size, limit)
+            truncated = (max_chars is not None and
+                         len(contents) > max_chars * char_size)
+            contents = contents[:len(contents) - len(contents) % char_size]
+            if truncated:
+                contents = contents[:max_chars * char_size]
+        encoding = self._encoding or _default_string_encoding(char_size)
+        return contents.decode(encoding, 'replace'), truncated
+
+    def _gala_summary(self) -> str:
+        """Returns the summary lldb shows for this string."""
+        if self._address == 0:
+            return '0x0'
+        max_chars = _get_setting('target.max-string-summary-length', int)
+        if max_chars is None:
+            max_chars = _DEFAULT_MAX_STRING_SUMMARY_LENGTH
+        text, truncated = self._fetch(max_chars)
+        return '"%s"%s' % (text, '...' if truncated else '')
+
+
+# gdb's defaults for 'print elements' and 'print max-depth', in case lldb
+# doesn't have a value for the matching settings.
+_DEFAULT_MAX_ELEMENTS = 200
+_DEFAULT_MAX_DEPTH = 20
+
+# `format_string` formats that apply to integers, chars, bools, enums and
+# pointers.
+_INTEGER_FORMATS = frozenset('xzoutdca')
+
+_CHAR_BASIC_TYPES = frozenset([
+    lldb.eBasicTypeChar,
+    lldb.eBasicTypeSignedChar,
+    lldb.eBasicTypeUnsignedChar,
+    lldb.eBasicTypeWChar,
+    lldb.eBasicTypeSignedWChar,
+    lldb.eBasicTypeUnsignedWChar,
+    lldb.eBasicTypeChar16,
+    lldb.eBasicTypeChar32,
+])
+
+_CHAR_ESCAPES = {
+    7: '\\a', 8: '\\b', 9: '\\t', 10: '\\n', 11: '\\v', 12: '\\f',
+    13: '\\r', 27: '\\033',
+}
+
+
+def _is_char_type(t: Type) -> bool:
+    return t.sbtype().GetCanonicalType().GetBasicType() in _CHAR_BASIC_TYPES
+
+
+def _escape_char(code: int, quote: str, char_size: int = 1) -> str:
+    """Returns character `code` escaped like gdb does between `quote`s."""
+    escape = _CHAR_ESCAPES.get(code)
+    if escape is not None:
+        return escape
+    if code == ord(quote) or code == ord('\\'):
+        return '\\' + chr(code)
+    if 32 <= code < 127 or (char_size > 1 and code >= 128 and
+                            chr(code).isprintable()):
+        return chr(code)
+    return '\\%03o' % code
+
+
+class _ArrayContents(object):
+    """The bytes of an array in memory, read in growing blocks when needed.
+
+    Arrays that are not in memory (`address` is None) only have `data`.
+    """
+
+    def __init__(self, address: Optional[int], size: int,
+                 data: bytes = b''):
+        self._address = address
+        self._size = size
+        self._data = data
+
+    def get(self, end: int) -> bytes:
+        """Returns the array bytes read so far, at least `end` of them."""
+        end = min(end, self._size)
+        if end > len(self._data) and self._address is None:
+            # All we have is what lldb gave us.
+            raise error('Cannot access the contents of the array.')
+        if end > len(self._data):
+            # At least double what we have, so reading a long array one
+            # element at a time takes few reads.
+            end = min(self._size,
+                      max(end, 2 * len(self._data), _MEMORY_PAGE_SIZE))
+            self._data += _read_memory(self._address + len(self._data),
+                                       end - len(self._data))
+        return self._data
+
+
+def _repeat_count(contents: _ArrayContents, index: int, element_size: int,
+                  length: int) -> int:
+    """Returns how many elements from `index` have the same bytes as it."""
+    start = index * element_size
+    element = contents.get(start + element_size)[start:start + element_size]
+    count = 1
+    step = 1
+    while index + count < length:
+        # Compare growing blocks of elements at once, and go back to single
+        # elements when a block doesn't match.
+        n = min(step, length - index - count)
+        block_start = start + count * element_size
+        block_end = block_start + n * element_size
+        if contents.get(block_end)[block_start:block_end] == element * n:
+            count += n
+            step *= 2
+        elif step > 1:
+            step = 1
+        else:
+            break
+    return count
+
+
+class _ValueFormatter(object):
+    """Formats values for `Value.format_string`."""
+
+    def __init__(self, raw: bool, pretty_structs: bool, array_indexes: bool,
+                 unions: bool, max_elements: int, max_depth: int,
+                 repeat_threshold: int, format: Optional[str],
+                 summary: bool):
+        self._raw = raw
+        self._pretty_structs = pretty_structs
+        self._array_indexes = array_indexes
+        self._unions = unions
+        self._max_elements = max_elements
+        self._max_depth = max_depth
+        self._repeat_threshold = repeat_threshold
+        self._format = format
+        self._summary = summary
+
+    def format(self, value: Value, depth: int) -> str:
+        t = value.type.strip_typedefs()
+        code = t.code
+        if code == TYPE_CODE_REF:
+            target = value.referenced_value()
+            return '@0x%x: %s' % (int(target.address),
+                                  self.format(target, depth))
+        if code in (TYPE_CODE_STRUCT, TYPE_CODE_UNION, TYPE_CODE_ARRAY):
+            if self._summary:
+                return '...'
+            if self._max_depth >= 0 and depth > self._max_depth:
+                return '{...}'
+            if code == TYPE_CODE_ARRAY:
+                return self._format_array(value, t, depth)
+            return self._format_struct(value, t, depth)
+        return self._format_scalar(value, t)
+
+    def _format_struct(self, value: Value, t: Type, depth: int) -> str:
+        if not self._raw:
+            sbvalue = value._sbvalue_object
+            if (sbvalue.GetTypeSummary().IsValid() or
+                sbvalue.GetTypeSynthetic().IsValid()):
+                return str(value)
+        parts = []
+        for f in t.fields():
+            if f.is_base_class:
+                parts.append('<%s> = %s' %
+                             (f.name, self.format(value.cast(f.type),
+                                                  depth + 1)))
+                continue
+            member = value[f]
+            if (not self._unions and
+                f.type.strip_typedefs().code == TYPE_CODE_UNION):
+                text = '{...}'
+            else:
+                text = self.format(member, depth + 1)
+            parts.append('%s = %s' % (f.name, text) if f.name else text)
+        if not parts:
+            return '{<No data fields>}'
+        if self._pretty_structs:
+            indent = '  ' * (depth + 1)
+            return '{\n%s\n%s}' % (',\n'.join(indent + p for p in parts),
+                                    '  ' * depth)
+        return '{%s}' % ', '.join(parts)
+
+    def _format_array(self, value: Value, t: Type, depth: int) -> str:
+        element_type = t.target()
+        element_size = element_type.sizeof
+        length = t.sizeof // element_size if element_size else 0
+        address = value._address
+        if address is None:
+            address = value._sbvalue_object.GetLoadAddress()
+            if address == lldb.LLDB_INVALID_ADDRESS:
+                address = None
+        if address is None:
+            # Arrays that don't live in memory have their contents in the
+            # SBValue.
+            err = lldb.SBError()
+            data = value._sbvalue_object.GetData()
+            contents = _ArrayContents(
+                None, t.sizeof, data.ReadRawData(err, 0, t.sizeof) or b'')
+        else:
+            contents = _ArrayContents(address, t.sizeof)
+        limit = self._max_elements or length
+        if _is_char_type(element_type) and element_size in (1, 2, 4):
+            return self._format_char_array(contents, element_size, length,
+                                           limit)
+        threshold = self._repeat_threshold
+        parts = []
+        index = 0
+        printed = 0
+        while index < length and printed < limit:
+            if threshold:
+                reps = _repeat_count(contents, index, element_size, length)
+            else:
+                reps = 1
+            if address is not None:
+                element = Value._without_sbvalue(
+                    element_type, address=address + index * element_size)
+            else:
+                element = value[index]
+            text = self.format(element, depth + 1)
+            if reps > threshold and threshold:
+                if self._array_indexes:
+                    text = '[%d] = %s' % (index, text)
+                parts.append('%s <repeats %d times>' % (text, reps))
+                index += reps
+                printed += threshold
+                continue
+            # Short runs are printed element by element, but they all have the
+            # same contents so they are only formatted once.
+            reps = min(reps, limit - printed)
+            for i in range(index, index + reps):
+                if self._array_indexes:
+                    parts.append('[%d] = %s' % (i, text))
+                else:
+                    parts.append(text)
+            index += reps
+            printed += reps
+        return '{%s%s}' % (', '.join(parts), '...' if index < length else '')
+
+    def _format_char_array(self, contents: _ArrayContents, char_size: int,
+                           length: int, limit: int) -> str:
+        count = min(length, limit)
+        data = contents.get(count * char_size)[:count * char_size]
+        # Like lldb, and gdb with 'print null-stop', stop at the first NUL.
+        end = _find_string_terminator(data, char_size, 0)
+        if end >= 0:
+            data = data[:end]
+        text = self._format_chars(data, char_size)
+        return text + ('...' if end < 0 and count < length else '')
+
+    def _format_chars(self, data: bytes, char_size: int) -> str:
+        byte_order = _target_byte_order()
+        chars = []
+        for i in range(0, len(data) - len(data) % char_size, char_size):
+            code = int.from_bytes(data[i:i + char_size], byte_order)
+            chars.append(_escape_char(code, '"', char_size))
+        return '"%s"' % ''.join(chars)
+
+    def _format_scalar(self, value: Value, t: Type) -> str:
+        code = t.code
+        is_char = code in (TYPE_CODE_INT, TYPE_CODE_CHAR) and _is_char_type(t)
+        if self._format is not None and (
+                is_char or code in (TYPE_CODE_INT, TYPE_CODE_CHAR,
+                                    TYPE_CODE_ENUM, TYPE_CODE_BOOL,
+                                    TYPE_CODE_PTR)):
+            return self._apply_format(int(value), t)
+        if code == TYPE_CODE_ENUM:
+            return t._format_enum_value(int(value))
+        if code == TYPE_CODE_BOOL:
+            number = int(value)
+            return {0: 'false', 1: 'true'}.get(number, str(number))
+        if code == TYPE_CODE_PTR:
+            address = int(value)
+            result = '0x%x' % address
+            target = t.target().strip_typedefs()
+            if address and _is_char_type(target) and target.sizeof in (1, 2,
+                                                                       4):
+                # Like gdb, show what char pointers point to. Read one more
+                # character than we print, to know whether to add '...'.
+                char_size = target.sizeof
+                limit = self._max_elements or None
+                try:
+                    data = _read_c_string(address, char_size,
+                                          limit and limit + 1)
+                except error:
+                    return ('%s <error: Cannot access memory at address 0x%x>'
+                            % (result, address))
+                truncated = (limit is not None and
+                             len(data) > limit * char_size)
+                if truncated:
+                    data = data[:limit * char_size]
+                result += ' ' + self._format_chars(data, char_size)
+                if truncated:
+                    result += '...'
+            return result
+        if is_char:
+            return self._format_char(int(value), t)
+        if code == TYPE_CODE_INT:
+            return str(int(value))
+        return str(value)
+
+    def _format_char(self, number: int, t: Type) -> str:
+        code = number & ((1 << (8 * t.sizeof)) - 1)
+        return "%d '%s'" % (number, _escape_char(code, "'", t.sizeof))
+
+    def _apply_format(self, number: int, t: Type) -> str:
+        bits = 8 * t.sizeof
+        unsigned = number & ((1 << bits) - 1)
+        fmt = self._format
+        if fmt in ('x', 'a'):
+            return '0x%x' % unsigned
+        if fmt == 'z':
+            return '0x%0*x' % (bits // 4, unsigned)
+        if fmt == 'o':
+            return '0%o' % unsigned if unsigned else '0'
+        if fmt == 't':
+            return bin(unsigned)[2:]
+        if fmt == 'u':
+            return str(unsigned)
+        signed = unsigned - (1 << bits) if unsigned >> (bits - 1) else unsigned
+        if fmt == 'c':
+            return self._format_char(signed, t)
+        return str(signed)
+
 
 class Command:
     # These constants are used by Command subclasses to register commands as
@@ -944,66 +2973,488 @@ def _RunCommand(command: str) -> str:
         command, execution_context, result)
     return result.GetOutput()
 
-def _GetSetting(name: str) -> str:
-    """Returns the value of setting `name` as a string."""
-    result = _RunCommand("settings show %s" % name)
-    return result.split(" = ", maxsplit=1)[1]
+def _GetSetting(name: str) -> Optional[str]:
+    """Returns the value of setting `name` for the current target as a string,
+    or None if unknown."""
+    debugger = gala_get_current_debugger()
+    # `GetInternalVariableValue` reads the settings of the selected target,
+    # which is not always the one we are printing values of.
+    if debugger.GetSelectedTarget() == gala_get_current_target():
+        values = debugger.GetInternalVariableValue(name,
+                                                   debugger.GetInstanceName())
+        if values.GetSize() == 1:
+            return values.GetStringAtIndex(0)
+    # Fall back to the command interpreter, which is much slower.
+    result = _RunCommand("settings show %s" % name).split(" = ", maxsplit=1)
+    if len(result) != 2:
+        return None
+    return result[1].strip()
+
+
+# `settings` subcommands that don't change any setting.
+_READ_ONLY_SETTINGS_COMMANDS = frozenset(
+    ['settings show', 'settings list', 'settings write'])
+
+# Result of `_settings_key` while a printer callback is running. Printers don't
+# change settings, so it's only computed once per callback.
+_callback_settings_key = None
+
+
+def _settings_key() -> Any:
+    """Returns a key that changes whenever settings may have changed.
+
+    The key counts the `settings` commands run so far, according to the
+    command interpreter statistics. Settings changed through the SB API are
+    not seen. Without statistics (older lldb versions), the key changes on
+    every callback.
+    """
+    global _callback_settings_key
+    if _callback_settings_key is not None and current_target is not None:
+        return _callback_settings_key
+    key: Any = None
+    interpreter = gala_get_current_debugger().GetCommandInterpreter()
+    if hasattr(interpreter, 'GetStatistics'):
+        stats = interpreter.GetStatistics()
+        names = lldb.SBStringList()
+        if stats.IsValid() and stats.GetKeys(names):
+            key = 0
+            for i in range(names.GetSize()):
+                name = names.GetStringAtIndex(i)
+                if (name.startswith('settings ') and
+                    name not in _READ_ONLY_SETTINGS_COMMANDS):
+                    key += stats.GetValueForKey(name).GetIntegerValue()
+    if key is None:
+        key = object()
+    if current_target is not None:
+        _callback_settings_key = key
+    return key
+
+
+def _get_setting(name: str, convert: Callable[[str], Any]) -> Any:
+    """Returns the value of setting `name` converted with `convert`.
+
+    Values are remembered for each target until settings change. See
+    `_settings_key`.
+    """
+    state = _target_state()
+    key = _settings_key()
+    if state.settings_key != key:
+        state.settings.clear()
+        state.settings_key = key
+    if name in state.settings:
+        return state.settings[name]
+    value = _GetSetting(name)
+    if value is not None:
+        try:
+            value = convert(value)
+        except ValueError:
+            value = None
+    state.settings[name] = value
+    return value
+
+
+# gdb parameter -> lldb setting with the same meaning, and how to convert its
+# value.
+#
+# gdb's 'print elements' is used for number of array elements to print and
+# also max number of chars in a string. lldb has 'target.max-children-count'
+# and 'target.max-string-summary-length', but max-children-count seems like
+# a closer match. gdb 14 added 'print characters' for strings.
+_PARAMETER_SETTINGS = {
+    'print elements': ('target.max-children-count', int),
+    'print characters': ('target.max-string-summary-length', int),
+    'print max-depth': ('target.max-children-depth', int),
+}
+
+# gdb parameters without an lldb setting, and the value that matches what lldb
+# does.
+_PARAMETER_CONSTANTS = {
+    # lldb doesn't compress repeated elements, so use gdb's default.
+    'print repeats': 10,
+    # lldb stops printing char arrays at the first null character.
+    'print null-stop': True,
+    # gdb's default. `Value.format_string` follows it, so printers get the
+    # same one-line output as in gdb.
+    'print pretty': False,
+}
+
 
 class Parameter:
     pass
 
 
 def parameter(s: str) -> Any:
-    # gdb's 'print elements' is used for number of array elements to print and
-    # also max number of chars in a string. lldb has 'target.max-children-count'
-    # and 'target.max-string-summary-length', but max-children-count seems like
-    # a closer match.
-    if s == "print elements":
-        return int(_GetSetting('target.max-children-count'))
-    return None
+    setting = _PARAMETER_SETTINGS.get(s)
+    if setting is not None:
+        return _get_setting(*setting)
+    return _PARAMETER_CONSTANTS.get(s)
 
 
 class Inferior:
     def __init__(self, sbprocess: lldb.SBProcess):
         self._sbprocess = sbprocess
 
-    def read_memory(self,
-                    address: Union[Value, int],
-                    length: Union[Value, int]) -> memoryview:
-        """Reads `length` bytes at `address`. Returns a bytes object."""
+    def _read(self, address: int, length: int) -> bytes:
         # SBProcess.ReadMemory expects a positive length, so we need to handle
         # the empty case here.
         if length == 0:
-            return memoryview(b'')
+            return b''
+        cache = _memory_cache(self._sbprocess)
+        if cache is not None:
+            return cache.read(address, length)
         err = lldb.SBError()
-        result = self._sbprocess.ReadMemory(int(address), int(length), err)
+        result = self._sbprocess.ReadMemory(address, length, err)
         if not err.Success():
             raise RuntimeError(err)
-        return memoryview(result)
+        return result
+
+    def read_memory(self,
+                    address: Union[Value, int],
+                    length: Union[Value, int]) -> memoryview:
+        """Reads `length` bytes at `address`. Returns a bytes object."""
+        return memoryview(self._read(int(address), int(length)))
+
+    def read_memory_many(
+            self,
+            requests: Sequence[Tuple[Union[Value, int], Union[Value, int]]]
+    ) -> List[memoryview]:
+        """Reads several (address, length) ranges. GALA extension.
+
+        Returns a memoryview for each request, in the same order. Ranges that
+        overlap or are close to each other are read together, and their results
+        are slices of the same buffer, so reading many small objects only takes
+        a few reads.
+        """
+        ranges = [(int(address), int(length)) for address, length in requests]
+        if any(length < 0 for _, length in ranges):
+            raise ValueError("length argument can't be negative.")
+        results: List[Optional[memoryview]] = [None] * len(ranges)
+        group: List[int] = []
+        group_start = group_end = 0
+        for i in sorted(range(len(ranges)), key=lambda i: ranges[i][0]):
+            address, length = ranges[i]
+            end = max(group_end, address + length)
+            if (group and address <= group_end + _MAX_COALESCING_GAP and
+                end - group_start <= _MAX_COALESCED_READ):
+                group.append(i)
+                group_end = end
+                continue
+            self._read_group(ranges, group, group_start, group_end, results)
+            group = [i]
+            group_start = address
+            group_end = address + length
+        self._read_group(ranges, group, group_start, group_end, results)
+        return results
+
+    def _read_group(self, ranges: List[Tuple[int, int]], group: List[int],
+                    start: int, end: int,
+                    results: List[Optional[memoryview]]) -> None:
+        """Reads [start, end) and slices it into `results` for `group`."""
+        if not group:
+            return
+        try:
+            data = memoryview(self._read(start, end - start))
+        except RuntimeError:
+            if len(group) == 1:
+                raise
+            # Maybe the gap between two ranges is not readable. Read each
+            # range on its own, so only unreadable ranges fail.
+            for i in group:
+                address, length = ranges[i]
+                results[i] = memoryview(self._read(address, length))
+            return
+        for i in group:
+            address, length = ranges[i]
+            results[i] = data[address - start:address - start + length]
+
+    def read_memory_into(self,
+                         address: Union[Value, int],
+                         buffer: Any) -> None:
+        """Fills `buffer` with memory at `address`. GALA extension.
+
+        `buffer` can be any writable object supporting the buffer protocol,
+        such as a `bytearray` or an `array.array`.
+        """
+        view = memoryview(buffer).cast('B')
+        view[:] = self._read(int(address), view.nbytes)
+
+    def write_memory(self,
+                     address: Union[Value, int],
+                     buffer: Any,
+                     length: Optional[Union[Value, int]] = None) -> None:
+        """Writes `length` bytes of `buffer` (all of it by default) at
+        `address`."""
+        data = bytes(memoryview(buffer).cast('B'))
+        if length is not None:
+            data = data[:int(length)]
+        if not data:
+            return
+        err = lldb.SBError()
+        written = self._sbprocess.WriteMemory(int(address), data, err)
+        # Even a failed write may have changed part of the memory.
+        _memory_written()
+        if not err.Success() or written != len(data):
+            raise error('Cannot access memory at address 0x%x' % int(address))
 
 
 def selected_inferior() -> Inferior:
     return Inferior(gala_get_current_target().GetProcess())
 
 
-def parse_and_eval(expr) -> Value:
+def _evaluate(expr: str, may_modify: bool = False) -> Value:
+    """Evaluates `expr` with lldb.
+
+    If `may_modify` is set, the expression may have written to memory without
+    resuming the process (which the stop ID doesn't reflect), so cached memory
+    and expression results are dropped.
+    """
+    global _callback_stop_key, _callback_frame
     opts = lldb.SBExpressionOptions()
-    sbvalue = gala_get_current_target().EvaluateExpression(expr, opts)
+    target = gala_get_current_target()
+    sbvalue = target.EvaluateExpression(expr, opts)
+    # Evaluating the expression may have run code in the inferior.
+    _callback_stop_key = None
+    _callback_frame = None
+    if may_modify:
+        _target_state().stop_expressions.clear()
+        _memory_written()
     if sbvalue and sbvalue.IsValid() and sbvalue.GetError().Success():
         return Value(sbvalue)
     raise error('Unable to evaluate "%s": %s' % (expr, sbvalue.GetError()))
 
 
+# Operators that modify their operands. Comparisons are not included.
+_MODIFYING_OPERATOR_RE = re.compile(
+    r'<<=|>>=|==|!=|<=|>=|\+\+|--|[-+*/%&|^]?=')
+# A call: a name, template argument list, subscript or parenthesized
+# expression followed by an argument list.
+_CALL_RE = re.compile(r'(\w+|[>\])])\s*\(')
+# Names followed by parentheses that are not calls.
+_NON_CALL_KEYWORDS = frozenset(['sizeof', 'alignof', '__alignof__', 'decltype',
+                                'typeof', '__typeof__'])
+_CAST_RE = re.compile(r'\b(static|reinterpret|const|dynamic)_cast\s*<[^;]*>$')
+_SIDE_EFFECT_KEYWORDS_RE = re.compile(r'\b(new|delete|throw)\b')
+
+
+def _may_have_side_effects(expr: str) -> bool:
+    """Returns True unless `expr` surely doesn't change the program state.
+
+    Assignments, increments, calls, `new`, `delete` and `throw` may have side
+    effects. This is conservative: for example, it doesn't know that `(x)(y)`
+    is a cast.
+    """
+    if _SIDE_EFFECT_KEYWORDS_RE.search(expr):
+        return True
+    for match in _MODIFYING_OPERATOR_RE.finditer(expr):
+        if match.group() not in ('==', '!=', '<=', '>='):
+            return True
+    for match in _CALL_RE.finditer(expr):
+        callee = match.group(1)
+        if callee in _NON_CALL_KEYWORDS:
+            continue
+        if callee == '>' and _CAST_RE.search(expr, 0, match.start() + 1):
+            continue
+        return True
+    return False
+
+
+# A global variable or constant, possibly qualified, possibly indexed by
+# constants: `g_config`, `ns::Class::static_member`, `ns::kTable[3]`.
+_GLOBAL_EXPRESSION_RE = re.compile(
+    r'^\s*(?:::\s*)?([A-Za-z_]\w*)((?:\s*::\s*[A-Za-z_]\w*)*)'
+    r'(?:\s*\[\s*\d+\s*\])*\s*$')
+
+# Maximum number of expressions cached per target.
+_MAX_CACHED_EXPRESSIONS = 1024
+
+
+class _GlobalExpression(NamedTuple):
+    """Where to find the result of an expression that only uses globals."""
+    type: Type
+    # Address of the result, for results in static storage.
+    address: Optional[int]
+    # Value of the result, for integral constants like enumerators.
+    scalar: Optional[int]
+
+    def value(self) -> Value:
+        return Value._without_sbvalue(self.type, scalar=self.scalar,
+                                      address=self.address)
+
+
+def _selected_frame() -> Tuple[Optional[lldb.SBFrame], Any]:
+    """Returns the frame expressions are evaluated in, and a key for it."""
+    global _callback_frame
+    if _callback_frame is not None and current_target is not None:
+        return _callback_frame
+    frame = None
+    key = None
+    sbprocess = gala_get_current_target().GetProcess()
+    if sbprocess.IsValid():
+        thread = sbprocess.GetSelectedThread()
+        frame = thread.GetSelectedFrame()
+        if frame.IsValid():
+            key = (thread.GetThreadID(), frame.GetCFA(), frame.GetPC())
+        else:
+            frame = None
+    if current_target is not None:
+        _callback_frame = (frame, key)
+    return frame, key
+
+
+def _unqualified_name(expr: str) -> Optional[str]:
+    """Returns the name `expr` starts with if it's unqualified.
+
+    Unqualified names could refer to locals, or to members of `this`. Returns
+    None for qualified names and expressions that can't be cached.
+    """
+    match = _GLOBAL_EXPRESSION_RE.match(expr)
+    if not match or match.group(2) or expr.lstrip().startswith('::'):
+        return None
+    return match.group(1)
+
+
+def _frame_scope(state: _TargetState, frame: lldb.SBFrame,
+                 frame_key: Any) -> Tuple[Optional[str], Optional['Type']]:
+    """Returns the name of the function of `frame`, and the type `this` points
+    to in it (None outside member functions). Computed once per stop."""
+    scope = state.frame_scopes.get(frame_key)
+    if scope is None:
+        this_type = None
+        this = frame.FindVariable('this')
+        if this.IsValid():
+            this_type = Type(this.GetType()).strip_typedefs().target(
+                ).strip_typedefs()
+        scope = (frame.GetFunctionName(), this_type)
+        state.frame_scopes[frame_key] = scope
+    return scope
+
+
+def _is_shadowed(state: _TargetState, frame: Optional[lldb.SBFrame],
+                 frame_key: Any, name: Optional[str]) -> bool:
+    """Returns True if `name` may refer to a local in `frame`, or to a data
+    member of `this`. Computed once per stop."""
+    if name is None or frame is None:
+        return False
+    key = (frame_key, name)
+    shadowed = state.shadowed_names.get(key)
+    if shadowed is None:
+        _, this_type = _frame_scope(state, frame, frame_key)
+        shadowed = frame.FindVariable(name).IsValid() or (
+            this_type is not None and
+            (name in this_type._get_member_index() or
+             this_type._has_field(name)))
+        state.shadowed_names[key] = shadowed
+    return shadowed
+
+
+def _global_expression(expr: str, result: Value
+                       ) -> Optional[_GlobalExpression]:
+    """Returns where to find the result of `expr` in later stops.
+
+    Returns None unless `expr` is a global in static storage or an integral
+    constant, which don't move until the modules or the process change.
+    """
+    if not _GLOBAL_EXPRESSION_RE.match(expr):
+        return None
+    result_type = result.type
+    if result_type.strip_typedefs().code == TYPE_CODE_REF:
+        return None
+    address = result._sbvalue_object.GetLoadAddress()
+    if address != lldb.LLDB_INVALID_ADDRESS:
+        target = gala_get_current_target()
+        # Globals are in a section of some module, unlike the heap and stack.
+        if not target.ResolveLoadAddress(address).GetSection().IsValid():
+            return None
+        return _GlobalExpression(result_type, address, None)
+    if result_type.strip_typedefs()._is_integral():
+        return _GlobalExpression(result_type, None, int(result))
+    return None
+
+
+def parse_and_eval(expr) -> Value:
+    """Evaluates `expr` in the selected frame.
+
+    Results are cached until the process resumes, and results of expressions
+    that only use globals and constants are reused until modules are
+    (un)loaded or the process restarts. Expressions that may have side effects,
+    like calls and assignments, are evaluated every time. Use
+    `gala_parse_and_eval_uncached` to evaluate other expressions every time.
+    """
+    if _may_have_side_effects(expr):
+        return _evaluate(expr, may_modify=True)
+    state = _target_state()
+    if not state.sbtarget or not state.sbtarget.IsValid():
+        return _evaluate(expr)
+    stop_key = _current_stop_key()
+    if (state.expressions_stop_key != stop_key or
+        len(state.stop_expressions) >= _MAX_CACHED_EXPRESSIONS):
+        state.stop_expressions.clear()
+        state.frame_scopes.clear()
+        state.shadowed_names.clear()
+        state.expressions_stop_key = stop_key
+    frame, frame_key = _selected_frame()
+    key = (frame_key, expr)
+    result = state.stop_expressions.get(key)
+    if result is not None:
+        return result
+
+    _check_module_events(state)
+    process_id = stop_key[0] if stop_key is not None else None
+    if (state.global_expressions_process != process_id or
+        len(state.global_expressions) >= _MAX_CACHED_EXPRESSIONS):
+        state.global_expressions.clear()
+        state.global_expressions_process = process_id
+    name = _unqualified_name(expr)
+    scope = None
+    if name is not None and frame is not None:
+        scope = _frame_scope(state, frame, frame_key)[0]
+    global_key = (scope, expr)
+    shadowed = _is_shadowed(state, frame, frame_key, name)
+    global_expression = state.global_expressions.get(global_key)
+    if global_expression is not None and not shadowed:
+        result = global_expression.value()
+    else:
+        result = _evaluate(expr)
+        if not shadowed:
+            global_expression = _global_expression(expr, result)
+            if global_expression is not None:
+                state.global_expressions[global_key] = global_expression
+    # Don't cache the result if evaluating it resumed the process.
+    if _current_stop_key() == stop_key:
+        state.stop_expressions[key] = result
+    return result
+
+
+def gala_parse_and_eval_uncached(expr: str) -> Value:
+    """Evaluates `expr` without using or updating the `parse_and_eval` cache.
+
+    This is a GALA extension, for expressions with side effects that
+    `parse_and_eval` can't detect.
+    """
+    return _evaluate(expr, may_modify=True)
+
+
 def lookup_type(name, block=None) -> Type:
     if name in BUILTIN_TYPE_NAME_TO_BASIC_TYPE:
-        return Type(get_builtin_sbtype(name))
-    # GDB lookups are always absolute, whereas lldb will return a type from
-    # within any context unless the name is absolute.
-    name_to_lookup = name if name.startswith('::') else '::' + name
-    t = gala_get_current_target().FindFirstType(name_to_lookup)
-    if not t:
+        return _builtin_type(name)
+    # Searching all the debug info is slow, and printers tend to look up the
+    # same types again and again, so remember the results (including failed
+    # lookups).
+    cache = _lookup_type_cache()
+    key = _normalize_type_name(name)
+    if cache is not None and key in cache:
+        result = cache[key]
+    else:
+        # GDB lookups are always absolute, whereas lldb will return a type from
+        # within any context unless the name is absolute.
+        name_to_lookup = name if name.startswith('::') else '::' + name
+        t = _find_first_type(name_to_lookup, key)
+        result = Type(t) if t else None
+        if cache is not None:
+            cache[key] = result
+    if result is None:
         raise error('No type named %s.' % name)
-    return Type(t)
+    return result
 
 
 class Objfile:
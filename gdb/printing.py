@@ -109,7 +109,12 @@ def _make_lldb_summary_function(
             pp = make_printer_func(gdb.Value(sbvalue.GetNonSyntheticValue()))
             if pp:
                 try:
-                    summary = str(pp.to_string())
+                    result = pp.to_string()
+                    if isinstance(result, gdb.LazyString):
+                        # Lazy strings are always quoted, and only read up
+                        # to lldb's string summary length limit.
+                        return result._gala_summary()
+                    summary = str(result)
                 except Exception as e:
                     summary = 'Error generating summary string: %s\n' % e
                     if DEBUG_ENABLED:
@@ -143,7 +148,8 @@ def _set_current_target(method: Callable) -> Callable:
 
 
 def _named_sbvalue(
-        parent: lldb.SBValue, name: str, v: Union[gdb.Value, int, str]
+        parent: lldb.SBValue, name: str,
+        v: Union[gdb.Value, gdb.LazyString, int, str]
 ) -> lldb.SBValue:
     """Creates an SBValue equivalent to `v`, but with name `name`.
 
@@ -156,6 +162,14 @@ def _named_sbvalue(
     We also support `int` and `str` values because prettyprinter scripts
     sometimes return values computed in Python rather than returned from gdb.
     """
+    if isinstance(v, gdb.LazyString):
+        if v.length >= 0 and v.address:
+            # Keep the explicit length by showing exactly that many characters.
+            char_type = v.type.strip_typedefs().target()
+            return parent.CreateValueFromAddress(
+                    name, v.address, char_type.sbtype().GetArrayType(v.length))
+        # Let lldb format the pointer or array, reading only what it shows.
+        v = v.value()
     if isinstance(v, gdb.Value):
         sbv = v.sbvalue()
         if sbv.GetLoadAddress() != lldb.LLDB_INVALID_ADDRESS:
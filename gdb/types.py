@@ -43,27 +43,13 @@ def get_basic_type(t):
       break
   return gdb.Type(sbtype)
 
-def _sbtype_has_field(sbtype, field_name):
-  """Recursive helper to have has_field search up the inheritance hierarchy."""
-  for f in sbtype.fields:
-    if f.name == field_name:
-      return True
-
-  for b in sbtype.bases:
-    if _sbtype_has_field(b.type, field_name):
-      return True
-
-  for b in sbtype.vbases:
-    if _sbtype_has_field(b.type, field_name):
-      return True
-
-  return False
-
-
 def has_field(t, field_name):
-  return _sbtype_has_field(t.sbtype(), field_name)
+  # Searches up the inheritance hierarchy too. The set of field names of each
+  # type is computed once and cached in the gdb.Type object.
+  return t._has_field(field_name)
 
 
 def make_enum_dict(t):
   """Returns a dict {'enum_value_name': enum_value...}."""
-  return {field.name: field.enumval for field in t.fields()}
+  # The fields are cached in the gdb.Type, no need to copy the list.
+  return {field.name: field.enumval for field in t._get_fields()}
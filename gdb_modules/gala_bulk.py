@@ -0,0 +1,887 @@
+"""Helpers to read program data in bulk.
+
+Printers usually read objects one field at a time through gdb.Value, which is
+slow when there are many objects to print: each access is a round trip to the
+debugger. The helpers in this module read whole objects (or arrays of objects)
+with a single memory read, and decode them in Python using the layout exposed
+by gdb.Type.
+
+Only the public gdb API is used, plus GALA's `gala_*` extensions when running
+in lldb, so these helpers work both in gdb and in lldb-with-GALA.
+"""
+import collections
+import struct
+
+import gdb
+
+IN_LLDB = hasattr(gdb, "__lldb_init_module")
+IN_GDB = not IN_LLDB
+
+# Caches for each gdb program space. See _target_caches.
+_progspace_caches = {}
+
+
+def _clear_progspace_caches(event):
+  _progspace_caches.clear()
+
+
+if IN_GDB:
+  gdb.events.new_objfile.connect(_clear_progspace_caches)
+  gdb.events.clear_objfiles.connect(_clear_progspace_caches)
+
+
+def _target_caches():
+  """Returns a dict for data that is only valid for the current program.
+
+  The dict is emptied when modules are loaded or unloaded, since types may
+  change then.
+  """
+  if IN_LLDB:
+    return gdb.gala_target_caches()
+  return _progspace_caches.setdefault(gdb.current_progspace(), {})
+
+
+def _target_byte_order():
+  """Returns the byte order of the program being debugged, 'big' or 'little'."""
+  if IN_LLDB:
+    return gdb.gala_target_byte_order()
+  caches = _target_caches()
+  byte_order = caches.get("byte_order")
+  if byte_order is None:
+    endian = gdb.execute("show endian", to_string=True)
+    byte_order = "big" if "big endian" in endian else "little"
+    caches["byte_order"] = byte_order
+  return byte_order
+
+
+def _struct_prefix():
+  return ">" if _target_byte_order() == "big" else "<"
+
+
+_INT_CODES = {1: "b", 2: "h", 4: "i", 8: "q"}
+_FLOAT_CODES = {4: "f", 8: "d"}
+
+
+def scalar_format(t):
+  """Returns the `struct` format character for values of type `t`.
+
+  Integers, chars, enums and pointers map to integer formats of their size,
+  bools to '?' and floats to 'f' or 'd'. Returns None if `t` is not a scalar
+  type that `struct` can decode (for example, aggregates or long double).
+  """
+  t = t.strip_typedefs()
+  size = t.sizeof
+  if t.code == gdb.TYPE_CODE_BOOL and size == 1:
+    return "?"
+  if t.code == gdb.TYPE_CODE_FLT:
+    return _FLOAT_CODES.get(size)
+  if t.code == gdb.TYPE_CODE_PTR:
+    code = _INT_CODES.get(size)
+    return code.upper() if code else None
+  if t.code in (gdb.TYPE_CODE_INT, gdb.TYPE_CODE_CHAR, gdb.TYPE_CODE_ENUM,
+                gdb.TYPE_CODE_BOOL):
+    code = _INT_CODES.get(size)
+    if code and not t.is_signed:
+      code = code.upper()
+    return code
+  return None
+
+
+def _is_aggregate(t):
+  return t.strip_typedefs().code in (gdb.TYPE_CODE_STRUCT, gdb.TYPE_CODE_UNION)
+
+
+class _FieldLayout(object):
+  """Where to find a scalar field inside a record, and how to decode it."""
+
+  def __init__(self, name, bitpos, bitsize, field_type, fmt):
+    self.name = name
+    self.bitpos = bitpos
+    self.bitsize = bitsize
+    self.type = field_type
+    self.format = fmt
+
+  @property
+  def offset(self):
+    return self.bitpos // 8
+
+
+def scalar_fields(struct_type):
+  """Returns the layout of all the scalar fields of `struct_type`.
+
+  Members of base classes and of anonymous structs and unions are included, as
+  if they were direct members, with offsets relative to `struct_type`. When
+  several fields have the same name, the first one (the one gdb would find) is
+  kept.
+  """
+  result = collections.OrderedDict()
+  _collect_scalar_fields(struct_type, 0, result)
+  return list(result.values())
+
+
+def _collect_scalar_fields(t, base_bitpos, result):
+  fields = t.strip_typedefs().fields()
+  # Direct members shadow members of bases and anonymous members.
+  for f in fields:
+    if f.is_base_class or not f.name or f.name in result:
+      continue
+    fmt = scalar_format(f.type)
+    if fmt is not None:
+      result[f.name] = _FieldLayout(f.name, base_bitpos + f.bitpos, f.bitsize,
+                                    f.type, fmt)
+  for f in fields:
+    if (f.is_base_class or not f.name) and _is_aggregate(f.type):
+      _collect_scalar_fields(f.type, base_bitpos + f.bitpos, result)
+
+
+def _bitfield_shift(layout, first_byte, num_bytes):
+  """Returns how much to shift the `num_bytes` bytes starting at `first_byte`
+  (read as an integer in target byte order) to get bitfield `layout`."""
+  bit = layout.bitpos - first_byte * 8
+  if _target_byte_order() == "big":
+    # gdb counts bit positions from the most significant bit on big endian
+    # targets.
+    return num_bytes * 8 - bit - layout.bitsize
+  return bit
+
+
+def _bitfield_sign_bit(layout):
+  return 1 << (layout.bitsize - 1) if layout.type.is_signed else 0
+
+
+def _bitfield_decoder(layout):
+  """Returns a function decoding bitfield `layout` from a buffer and offset."""
+  first_byte = layout.bitpos // 8
+  num_bytes = (layout.bitpos % 8 + layout.bitsize + 7) // 8
+  shift = _bitfield_shift(layout, first_byte, num_bytes)
+  mask = (1 << layout.bitsize) - 1
+  sign_bit = _bitfield_sign_bit(layout)
+  byte_order = _target_byte_order()
+
+  def decode(data, offset):
+    start = offset + first_byte
+    value = (int.from_bytes(data[start:start + num_bytes], byte_order) >>
+             shift) & mask
+    if value & sign_bit:
+      value -= mask + 1
+    return value
+
+  return decode
+
+
+class RecordDecoder(object):
+  """Decodes scalar fields of a struct from the raw bytes of the struct.
+
+  The field layout is compiled once into a `struct.Struct` (plus shift and mask
+  steps for bitfields and overlapping union members), so decoding an object
+  costs one memory read and one `unpack_from` call. Records are namedtuples
+  with one element per field; field names that are not valid identifiers are
+  renamed by `collections.namedtuple`.
+  """
+
+  def __init__(self, struct_type, field_names=None):
+    self.type = struct_type
+    self.size = struct_type.sizeof
+    layouts = scalar_fields(struct_type)
+    if field_names is not None:
+      by_name = dict((layout.name, layout) for layout in layouts)
+      try:
+        layouts = [by_name[name] for name in field_names]
+      except KeyError as e:
+        raise gdb.error("No scalar field named %s in %s." % (e, struct_type))
+    self.fields = layouts
+    self.record_type = collections.namedtuple(
+        "Record", [layout.name for layout in layouts], rename=True)
+
+    # Fields that don't overlap with the previous ones are unpacked with a
+    # single precompiled Struct. The rest (bitfields and union members) are
+    # decoded one by one.
+    fmt = [_struct_prefix()]
+    position = 0
+    self._packed_indices = []
+    self._other_decoders = []
+    for i, layout in sorted(enumerate(layouts), key=lambda x: x[1].bitpos):
+      if layout.bitsize:
+        self._other_decoders.append((i, _bitfield_decoder(layout)))
+      elif layout.offset >= position:
+        if layout.offset > position:
+          fmt.append("%dx" % (layout.offset - position))
+        fmt.append(layout.format)
+        position = layout.offset + struct.calcsize("<" + layout.format)
+        self._packed_indices.append(i)
+      else:
+        self._other_decoders.append(
+            (i, _unpacker_decoder(layout.offset, layout.format)))
+    self._struct = struct.Struct("".join(fmt))
+
+  def decode(self, data, offset=0):
+    """Decodes a record from `data`, starting at `offset`."""
+    values = [None] * len(self.fields)
+    for i, value in zip(self._packed_indices,
+                        self._struct.unpack_from(data, offset)):
+      values[i] = value
+    for i, decode in self._other_decoders:
+      values[i] = decode(data, offset)
+    return self.record_type._make(values)
+
+  def read(self, value):
+    """Reads and decodes the object `value`, a gdb.Value of our type."""
+    data = gdb.selected_inferior().read_memory(int(value.address), self.size)
+    return self.decode(data)
+
+  def read_array(self, address, count):
+    """Reads and decodes `count` consecutive objects at `address`."""
+    data = gdb.selected_inferior().read_memory(int(address), self.size * count)
+    return [self.decode(data, i * self.size) for i in range(count)]
+
+
+def _unpacker_decoder(offset, fmt):
+  unpacker = struct.Struct(_struct_prefix() + fmt)
+  return lambda data, base: unpacker.unpack_from(data, base + offset)[0]
+
+
+def _cached(cache_name, t, key, build):
+  """Returns build(), cached for type `t` and `key` in cache `cache_name`.
+
+  Results are kept in the caches of the current program, under
+  (cache name, str(type)) -> [(type, key, result)]. gdb.Type is not hashable
+  in every gdb version, so we can't use types as keys directly.
+  """
+  candidates = _target_caches().setdefault((cache_name, str(t)), [])
+  for cached_type, cached_key, result in candidates:
+    if cached_key == key and cached_type == t:
+      return result
+  result = build()
+  candidates.append((t, key, result))
+  return result
+
+
+def record_decoder(struct_type, field_names=None):
+  """Returns a (cached) RecordDecoder for `struct_type`."""
+  if field_names is not None:
+    field_names = tuple(field_names)
+  return _cached("record_decoder", struct_type, field_names,
+                 lambda: RecordDecoder(struct_type, field_names))
+
+
+def decode_record(value, field_names=None):
+  """Reads the scalar fields of struct `value` with a single memory read.
+
+  Args:
+    value: gdb.Value of a struct, class or union type. Must live in memory.
+    field_names: names of the fields to decode. Defaults to all scalar fields,
+                 including those of base classes and anonymous members.
+
+  Returns:
+    A namedtuple with the value of each field.
+  """
+  return record_decoder(value.type, field_names).read(value)
+
+
+def _scalar_dtype_string(t):
+  """Returns the NumPy type string for scalar type `t`, or None."""
+  t = t.strip_typedefs()
+  size = t.sizeof
+  if t.code == gdb.TYPE_CODE_BOOL and size == 1:
+    return "?"
+  if t.code == gdb.TYPE_CODE_FLT:
+    return "%sf%d" % (_struct_prefix(), size) if size in (2, 4, 8) else None
+  if t.code == gdb.TYPE_CODE_PTR:
+    return "%su%d" % (_struct_prefix(), size)
+  if t.code in (gdb.TYPE_CODE_INT, gdb.TYPE_CODE_CHAR, gdb.TYPE_CODE_ENUM,
+                gdb.TYPE_CODE_BOOL):
+    kind = "i" if t.is_signed else "u"
+    return "%s%s%d" % (_struct_prefix(), kind, size)
+  return None
+
+
+def _dtype_description(t):
+  """Returns a description of `t` that `numpy.dtype` accepts."""
+  stripped = t.strip_typedefs()
+  if stripped.code == gdb.TYPE_CODE_ARRAY:
+    element = stripped.target()
+    count = stripped.sizeof // element.sizeof if element.sizeof else 0
+    return (_dtype_description(element), (count,))
+  if _is_aggregate(stripped):
+    names, formats, offsets = [], [], []
+    _collect_dtype_fields(stripped, 0, names, formats, offsets)
+    return {"names": names, "formats": formats, "offsets": offsets,
+            "itemsize": stripped.sizeof}
+  fmt = _scalar_dtype_string(stripped)
+  # Types NumPy can't represent (for example x87 long double) are kept as
+  # opaque bytes so the layout is still right.
+  return fmt if fmt is not None else "V%d" % stripped.sizeof
+
+
+def _collect_dtype_fields(t, base_offset, names, formats, offsets):
+  for f in t.fields():
+    if not hasattr(f, "bitpos") or f.bitsize:
+      # Static members and bitfields have no byte offset of their own. Use
+      # decode_record() to read bitfields.
+      continue
+    offset = base_offset + f.bitpos // 8
+    if not f.name and _is_aggregate(f.type):
+      # Anonymous members are flattened into the enclosing record, like
+      # their members are accessed in C and C++.
+      _collect_dtype_fields(f.type.strip_typedefs(), offset, names, formats,
+                            offsets)
+      continue
+    name = f.name or "_%d" % len(names)
+    if name in names:
+      continue
+    names.append(name)
+    formats.append(_dtype_description(f.type))
+    offsets.append(offset)
+
+
+def numpy_dtype(t):
+  """Returns a NumPy dtype with the memory layout of type `t`.
+
+  Structs, classes and unions become structured dtypes with the offsets and
+  total size of the C++ type, so padding is preserved. Nested structs become
+  nested dtypes, fixed-size arrays become subarrays, and base classes are
+  fields named after the base class. Enums and pointers are integers. Members
+  of anonymous structs and unions are accessible directly. Bitfields are not
+  included.
+  """
+  import numpy
+  return _cached("numpy_dtype", t, None,
+                 lambda: numpy.dtype(_dtype_description(t)))
+
+
+def _array_elements(value, count):
+  """Returns (address, element type, count) for array or pointer `value`."""
+  stripped = value.type.strip_typedefs()
+  if stripped.code == gdb.TYPE_CODE_ARRAY:
+    element_type = stripped.target()
+    if count is None:
+      count = stripped.sizeof // element_type.sizeof
+    return int(value.address), element_type, count
+  if stripped.code == gdb.TYPE_CODE_PTR:
+    if count is None:
+      raise ValueError("An element count is required to read from a pointer.")
+    return int(value), stripped.target(), count
+  raise TypeError("Cannot read values of type \"%s\" as an array." %
+                  value.type)
+
+
+def read_numpy_array(value, count=None):
+  """Reads an array of structs (or scalars) into a NumPy ndarray.
+
+  The whole array is read with a single memory read. The result is a
+  structured array that can be sliced by field, for example
+  `read_numpy_array(particles)["x"]`.
+
+  Args:
+    value: a gdb.Value of array or pointer type. Pointers point to the first
+           element of the array.
+    count: number of elements to read. Required for pointers, and defaults to
+           the array length for arrays.
+  """
+  import numpy
+  address, element_type, count = _array_elements(value, count)
+  dtype = numpy_dtype(element_type)
+  if count <= 0:
+    return numpy.zeros(0, dtype=dtype)
+  data = gdb.selected_inferior().read_memory(address, dtype.itemsize * count)
+  # Copy into a bytearray so the result is writable.
+  return numpy.frombuffer(bytearray(data), dtype=dtype)
+
+
+# Pointer-based structures are read in pages of this size, so nodes allocated
+# close to each other (which is common) are read together.
+_PAGE_SIZE = 4096
+# Maximum number of pages kept by a _PageReader.
+_MAX_CACHED_PAGES = 256
+
+
+class _PageReader(object):
+  """Reads small objects from the inferior, one page at a time."""
+
+  def __init__(self):
+    self._inferior = gdb.selected_inferior()
+    self._pages = {}
+
+  def _store(self, page, data):
+    if len(self._pages) >= _MAX_CACHED_PAGES:
+      self._pages.clear()
+    self._pages[page] = data
+
+  def has(self, address):
+    """Returns whether the page containing `address` was already read."""
+    return address - address % _PAGE_SIZE in self._pages
+
+  def prefetch(self, addresses):
+    """Reads the pages containing `addresses` together, if possible.
+
+    Returns False if some page couldn't be read. read() then finds out which
+    one when it's needed.
+    """
+    pages = sorted(set(a - a % _PAGE_SIZE for a in addresses if a > 0))
+    pages = [p for p in pages if p not in self._pages]
+    if len(pages) < 2:
+      return True
+    try:
+      if hasattr(self._inferior, "read_memory_many"):
+        results = self._inferior.read_memory_many(
+            [(p, _PAGE_SIZE) for p in pages])
+        for page, data in zip(pages, results):
+          self._store(page, bytes(data))
+        return True
+      # Without read_memory_many, read each run of consecutive pages at once.
+      start = 0
+      for i in range(1, len(pages) + 1):
+        if i < len(pages) and pages[i] == pages[i - 1] + _PAGE_SIZE:
+          continue
+        if i - start > 1:
+          data = bytes(self._inferior.read_memory(
+              pages[start], (i - start) * _PAGE_SIZE))
+          for j in range(start, i):
+            offset = (j - start) * _PAGE_SIZE
+            self._store(pages[j], data[offset:offset + _PAGE_SIZE])
+        start = i
+    except RuntimeError:
+      return False
+    return True
+
+  def read(self, address, length):
+    """Returns `length` bytes at `address`. Raises RuntimeError on failure."""
+    offset = address % _PAGE_SIZE
+    if offset + length > _PAGE_SIZE:
+      return bytes(self._inferior.read_memory(address, length))
+    page = address - offset
+    data = self._pages.get(page)
+    if data is None:
+      try:
+        data = bytes(self._inferior.read_memory(page, _PAGE_SIZE))
+      except RuntimeError:
+        # The object may be readable even if the rest of the page isn't.
+        return bytes(self._inferior.read_memory(address, length))
+      self._store(page, data)
+    return data[offset:offset + length]
+
+
+def _node_pointer(node):
+  """Returns (pointer type, address) for `node`, a pointer or an object."""
+  stripped = node.type.strip_typedefs()
+  if stripped.code == gdb.TYPE_CODE_PTR:
+    return node.type, int(node)
+  return node.type.pointer(), int(node.address)
+
+
+def _subobject_offset(t, target):
+  """Returns the offset of a `target` subobject in `t`, or None if none."""
+  t = t.strip_typedefs().unqualified()
+  if t == target:
+    return 0
+  for f in t.fields():
+    if f.is_base_class:
+      offset = _subobject_offset(f.type, target)
+      if offset is not None:
+        return f.bitpos // 8 + offset
+  return None
+
+
+def _pointer_field(node_type, name):
+  """Returns (offset, struct.Struct, adjustment) to read pointer field `name`.
+
+  The field may point to a base class of `node_type` (like the `next` pointer
+  of intrusive lists), which is not always at the start of the node.
+  `adjustment` is the offset of that base class, to subtract from the pointer
+  to get the address of the node.
+  """
+
+  def build():
+    for layout in scalar_fields(node_type):
+      if layout.name == name:
+        stripped = layout.type.strip_typedefs()
+        if stripped.code != gdb.TYPE_CODE_PTR:
+          break
+        target = stripped.target().strip_typedefs().unqualified()
+        if target.code == gdb.TYPE_CODE_VOID:
+          adjustment = 0
+        else:
+          adjustment = _subobject_offset(node_type, target)
+        if adjustment is None:
+          raise gdb.error("%s in %s points to %s, which is not a %s." %
+                          (name, node_type, target, node_type))
+        return (layout.offset, struct.Struct(_struct_prefix() + layout.format),
+                adjustment)
+    raise gdb.error("No pointer field named %s in %s." % (name, node_type))
+
+  return _cached("pointer_field", node_type, name, build)
+
+
+# walk_list reads ahead the pages of up to this many nodes...
+_READ_AHEAD_NODES = 64
+# ...but at most this many pages at a time.
+_MAX_READ_AHEAD_PAGES = 16
+
+
+def _read_ahead_addresses(address, stride):
+  """Guesses the addresses of the nodes after the one at `address`."""
+  addresses = []
+  pages = set()
+  for i in range(_READ_AHEAD_NODES):
+    guess = address + i * stride
+    if guess <= 0:
+      break
+    pages.add(guess - guess % _PAGE_SIZE)
+    if len(pages) > _MAX_READ_AHEAD_PAGES:
+      break
+    addresses.append(guess)
+  return addresses
+
+
+def walk_list(head, next_field, limit=None):
+  """Yields the nodes of a linked list, following `next_field` pointers.
+
+  Node memory is read a page at a time, so walking a list whose nodes are
+  allocated close to each other takes few reads. The address of each node is
+  only known after reading the previous one, so when the next node is on a
+  page that wasn't read yet, the pages of the following nodes are read ahead
+  in a batch, guessing their addresses from the distance between the last two
+  nodes (lists are often allocated one node after the other).
+
+  The walk ends at a null pointer, at a node that was already visited (so
+  circular lists are walked once), at unreadable memory, or after `limit`
+  nodes.
+
+  Args:
+    head: gdb.Value with the first node, or a pointer to it.
+    next_field: name of the pointer to the next node. Can be a member of a base
+                class, like in most intrusive lists, and can point to a base
+                class of the node.
+    limit: maximum number of nodes to yield. No limit if None.
+
+  Yields:
+    A gdb.Value pointing to each node.
+  """
+  pointer_type, address = _node_pointer(head)
+  offset, unpacker, adjustment = _pointer_field(pointer_type.target(),
+                                                next_field)
+  reader = _PageReader()
+  visited = set()
+  # Set when a guessed page wasn't readable. Guesses are probably wrong from
+  # then on, so stop reading ahead.
+  read_ahead = True
+  while address and address not in visited:
+    if limit is not None and len(visited) >= limit:
+      return
+    visited.add(address)
+    try:
+      data = reader.read(address + offset, unpacker.size)
+    except RuntimeError:
+      return
+    yield gdb.Value(address).cast(pointer_type)
+    next_address = unpacker.unpack(data)[0]
+    if next_address:
+      next_address -= adjustment
+      if read_ahead and not reader.has(next_address + offset):
+        read_ahead = reader.prefetch(_read_ahead_addresses(
+            next_address + offset, next_address - address))
+    address = next_address
+
+
+def walk_tree_inorder(root, left, right, limit=None):
+  """Yields the nodes of a binary tree in order.
+
+  The children of each node are read together, and the walk ends early at
+  unreadable memory, at a node that was already visited, or after `limit`
+  nodes.
+
+  Args:
+    root: gdb.Value with the root node, or a pointer to it.
+    left: name of the pointer to the left child.
+    right: name of the pointer to the right child.
+    limit: maximum number of nodes to yield. No limit if None.
+
+  Yields:
+    A gdb.Value pointing to each node.
+  """
+  pointer_type, address = _node_pointer(root)
+  node_type = pointer_type.target()
+  left_offset, unpacker, left_adjustment = _pointer_field(node_type, left)
+  right_offset, _, right_adjustment = _pointer_field(node_type, right)
+  start = min(left_offset, right_offset)
+  length = max(left_offset, right_offset) + unpacker.size - start
+  reader = _PageReader()
+  visited = set()
+  stack = []
+  count = 0
+  while stack or address:
+    if limit is not None and count >= limit:
+      return
+    # Go down the left spine, remembering each node's right child.
+    while address:
+      if address in visited:
+        return
+      visited.add(address)
+      try:
+        data = reader.read(address + start, length)
+      except RuntimeError:
+        return
+      left_address = unpacker.unpack_from(data, left_offset - start)[0]
+      right_address = unpacker.unpack_from(data, right_offset - start)[0]
+      if left_address:
+        left_address -= left_adjustment
+      if right_address:
+        right_address -= right_adjustment
+      reader.prefetch((left_address, right_address))
+      stack.append((address, right_address))
+      address = left_address
+    node, address = stack.pop()
+    yield gdb.Value(node).cast(pointer_type)
+    count += 1
+
+
+# Large arrays are scanned in chunks of this many bytes, so memory use stays
+# bounded and callers that stop early don't read the whole array.
+_SCAN_CHUNK_SIZE = 1 << 20
+
+
+def _import_numpy():
+  try:
+    import numpy
+    return numpy
+  except ImportError:
+    return None
+
+
+def _scan_chunks(address, element_size, count):
+  """Yields (first index, data) chunks of an array of `count` elements."""
+  inferior = gdb.selected_inferior()
+  per_chunk = max(1, _SCAN_CHUNK_SIZE // element_size)
+  for first in range(0, count, per_chunk):
+    n = min(per_chunk, count - first)
+    yield first, inferior.read_memory(address + first * element_size,
+                                      n * element_size)
+
+
+def occupied_indices(buckets, count=None, empty=0):
+  """Yields the indices of the elements of `buckets` that are not `empty`.
+
+  This finds the used buckets of hash tables with separate chaining, like
+  `std::unordered_map`, where empty buckets are null pointers. The array is
+  read in bulk and, if NumPy is installed, compared with vectorized operations,
+  so sparse tables with millions of buckets are scanned quickly.
+
+  Args:
+    buckets: gdb.Value of array or pointer type. Elements must be scalars, such
+             as pointers or integers.
+    count: number of elements. Required for pointers, and defaults to the array
+           length for arrays.
+    empty: value of the unused elements.
+  """
+  address, element_type, count = _array_elements(buckets, count)
+  fmt = scalar_format(element_type)
+  if fmt is None:
+    raise TypeError("Cannot scan elements of type \"%s\"." % element_type)
+  size = element_type.sizeof
+  numpy = _import_numpy()
+  for first, data in _scan_chunks(address, size, count):
+    if numpy is not None:
+      elements = numpy.frombuffer(data, dtype=_scalar_dtype_string(element_type))
+      for i in numpy.flatnonzero(elements != empty):
+        yield first + int(i)
+    else:
+      for i, (element,) in enumerate(
+          struct.iter_unpack(_struct_prefix() + fmt, data)):
+        if element != empty:
+          yield first + i
+
+
+def control_byte_indices(control, count, mask=0x80, value=0):
+  """Yields the indices `i` such that `control[i] & mask == value`.
+
+  This finds the used slots of open-addressing hash tables that keep one
+  control byte per slot. The defaults match Abseil's Swiss tables
+  (`absl::flat_hash_map` and friends), where the control byte of a full slot
+  has its high bit clear. Bytes are compared with vectorized operations if
+  NumPy is installed.
+
+  Args:
+    control: gdb.Value pointing to the control bytes (an array or a pointer).
+    count: number of control bytes to scan (usually the table capacity).
+    mask: bits of each control byte to compare.
+    value: value of the masked bits for used slots.
+  """
+  address, element_type, count = _array_elements(control, count)
+  if element_type.sizeof != 1:
+    raise TypeError("Control bytes must have a 1-byte type, not \"%s\"." %
+                    element_type)
+  numpy = _import_numpy()
+  for first, data in _scan_chunks(address, 1, count):
+    if numpy is not None:
+      control_bytes = numpy.frombuffer(data, dtype=numpy.uint8)
+      for i in numpy.flatnonzero((control_bytes & mask) == value):
+        yield first + int(i)
+    else:
+      for i, byte in enumerate(bytes(data)):
+        if byte & mask == value:
+          yield first + i
+
+
+def occupied_slots(slots, indices):
+  """Yields (index, slot) for each index in `indices`.
+
+  `slots` is the gdb.Value with the slot array (or a pointer to its first
+  element). Slots are only read when used, so combined with
+  occupied_indices() or control_byte_indices() only the used slots of a table
+  are read, for example:
+
+    for i, slot in occupied_slots(slots, control_byte_indices(ctrl, capacity)):
+      ...
+  """
+  for i in indices:
+    yield i, slots[i]
+
+
+class BitfieldDecoder(object):
+  """Decodes all the bitfields of a struct at once.
+
+  The bytes spanning all the bitfields are read as a single integer, and each
+  bitfield is extracted with a precomputed (shift, mask) pair, instead of
+  asking the debugger for each bitfield of each value.
+  """
+
+  def __init__(self, struct_type):
+    self.type = struct_type
+    self.size = struct_type.sizeof
+    self.fields = [layout for layout in scalar_fields(struct_type)
+                   if layout.bitsize]
+    if not self.fields:
+      raise gdb.error("%s has no bitfields." % struct_type)
+    self.record_type = collections.namedtuple(
+        "Bitfields", [layout.name for layout in self.fields], rename=True)
+    self._start = min(layout.bitpos for layout in self.fields) // 8
+    end = max((layout.bitpos + layout.bitsize + 7) // 8
+              for layout in self.fields)
+    self._num_bytes = end - self._start
+    self._byte_order = _target_byte_order()
+    # (shift, mask, sign bit) for each field.
+    self._table = tuple(
+        (_bitfield_shift(layout, self._start, self._num_bytes),
+         (1 << layout.bitsize) - 1, _bitfield_sign_bit(layout))
+        for layout in self.fields)
+
+  def decode(self, data, offset=0):
+    """Decodes the bitfields of the object at `offset` in `data`."""
+    start = offset + self._start
+    word = int.from_bytes(data[start:start + self._num_bytes], self._byte_order)
+    values = []
+    for shift, mask, sign_bit in self._table:
+      value = (word >> shift) & mask
+      if value & sign_bit:
+        value -= mask + 1
+      values.append(value)
+    return self.record_type._make(values)
+
+  def read(self, value):
+    """Reads and decodes the bitfields of `value`, a gdb.Value of our type."""
+    data = gdb.selected_inferior().read_memory(
+        int(value.address) + self._start, self._num_bytes)
+    return self.decode(data, -self._start)
+
+  def read_columns(self, array, count=None):
+    """Decodes the bitfields of every element of an array of our type.
+
+    The array is read with a single memory read. Returns a dictionary with a
+    sequence of values per bitfield name: a NumPy array if NumPy is installed
+    (and then the fields are extracted with vectorized shifts and masks), or a
+    list otherwise.
+
+    Args:
+      array: gdb.Value of array or pointer type.
+      count: number of elements. Required for pointers, and defaults to the
+             array length for arrays.
+    """
+    address, _, count = _array_elements(array, count)
+    data = gdb.selected_inferior().read_memory(address, self.size * count)
+    numpy = _import_numpy()
+    if numpy is None or self._num_bytes > 8 or count == 0:
+      records = [self.decode(data, i * self.size) for i in range(count)]
+      return dict((layout.name, [r[i] for r in records])
+                  for i, layout in enumerate(self.fields))
+    raw = numpy.frombuffer(data, dtype=numpy.uint8).reshape(count, self.size)
+    raw = raw[:, self._start:self._start + self._num_bytes]
+    # Widen the bytes of each element to 8 bytes, so they can be read as one
+    # uint64 per element.
+    words = numpy.zeros((count, 8), dtype=numpy.uint8)
+    if self._byte_order == "big":
+      words[:, 8 - self._num_bytes:] = raw
+      words = words.view(">u8").ravel()
+    else:
+      words[:, :self._num_bytes] = raw
+      words = words.view("<u8").ravel()
+    columns = {}
+    for layout, (shift, mask, sign_bit) in zip(self.fields, self._table):
+      column = ((words >> numpy.uint64(shift)) &
+                numpy.uint64(mask)).astype(numpy.int64)
+      if sign_bit:
+        column = numpy.where(column & sign_bit, column - (mask + 1), column)
+      columns[layout.name] = column
+    return columns
+
+
+def bitfield_decoder(struct_type):
+  """Returns a (cached) BitfieldDecoder for `struct_type`."""
+  return _cached("bitfield_decoder", struct_type, None,
+                 lambda: BitfieldDecoder(struct_type))
+
+
+def decode_bitfields(value):
+  """Reads all the bitfields of struct `value` with a single memory read.
+
+  Returns a namedtuple with the value of each bitfield.
+  """
+  return bitfield_decoder(value.type).read(value)
+
+
+def set_bit_indices(words, num_bits=None):
+  """Returns the indices of the bits that are set in a bit array.
+
+  Bit arrays like `std::bitset` and `std::vector<bool>` store bits in an array
+  of integer words, where bit `i` is bit `i % N` (counting from the least
+  significant bit) of word `i // N`, with N bits per word. The words are read
+  with a single memory read and, if NumPy is installed, expanded with
+  `numpy.unpackbits`.
+
+  Args:
+    words: gdb.Value with the word array, or a pointer to its first word.
+    num_bits: number of bits in the bit array. Required for pointers, and
+              defaults to all the bits of the words for arrays.
+
+  Returns:
+    A list with the indices of the set bits, in increasing order.
+  """
+  stripped = words.type.strip_typedefs()
+  word_size = stripped.target().sizeof
+  word_bits = word_size * 8
+  count = None
+  if num_bits is not None:
+    count = (num_bits + word_bits - 1) // word_bits
+  address, _, count = _array_elements(words, count)
+  if num_bits is None:
+    num_bits = count * word_bits
+  data = gdb.selected_inferior().read_memory(address, count * word_size)
+  numpy = _import_numpy()
+  if numpy is not None:
+    raw = numpy.frombuffer(data, dtype=numpy.uint8)
+    if _target_byte_order() == "big" and word_size > 1:
+      # Put the least significant byte of each word first.
+      raw = raw.reshape(count, word_size)[:, ::-1].ravel()
+    bits = numpy.unpackbits(raw, count=num_bits, bitorder="little")
+    return numpy.flatnonzero(bits).tolist()
+  result = []
+  byte_order = _target_byte_order()
+  for i in range(count):
+    word = int.from_bytes(data[i * word_size:(i + 1) * word_size], byte_order)
+    while word:
+      lowest = word & -word
+      index = i * word_bits + lowest.bit_length() - 1
+      if index >= num_bits:
+        break
+      result.append(index)
+      word ^= lowest
+  return result
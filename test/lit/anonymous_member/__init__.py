@@ -0,0 +1,15 @@
+import gdb
+
+t = gdb.parse_and_eval("t")
+print("tag = %d" % t["tag"])
+print("i = %d" % t["i"])
+print("lo = %d" % t["lo"])
+print("hi = %d" % t["hi"])
+print("base = %d" % t["base"])
+print("flag = %d" % t["flag"])
+
+p = gdb.parse_and_eval("p")
+print("ptr->i = %d" % p["i"])
+
+print("lo.address ok: %s" %
+      (int(t["lo"].address) == int(gdb.parse_and_eval("&t.lo"))))
@@ -0,0 +1,32 @@
+struct Base {
+  int base;
+};
+
+struct Tagged : Base {
+  int tag;
+  union {
+    int i;
+    float f;
+  };
+  union {
+    struct {
+      short lo;
+      short hi;
+    };
+    int both;
+  };
+  unsigned flag : 1;
+};
+
+Tagged t;
+Tagged *p = &t;
+
+int main() {
+  t.base = 7;
+  t.tag = 1;
+  t.i = 42;
+  t.lo = 3;
+  t.hi = 4;
+  t.flag = 1;
+  return 0;
+}
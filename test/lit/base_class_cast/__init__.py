@@ -0,0 +1,12 @@
+import gdb
+
+d = gdb.parse_and_eval("d")
+print("(Left)d.left = %d" % d.cast(gdb.lookup_type("Left"))["left"])
+print("(Right)d.right = %d" % d.cast(gdb.lookup_type("Right"))["right"])
+print("(Root)d.root = %d" % d.cast(gdb.lookup_type("Root"))["root"])
+print("(RootAlias)d.root = %d" % d.cast(gdb.lookup_type("RootAlias"))["root"])
+
+# Casting again uses the offset computed by the first cast.
+print("again (Right)d.right = %d" % d.cast(gdb.lookup_type("Right"))["right"])
+d2 = gdb.parse_and_eval("d2")
+print("(Right)d2.right = %d" % d2.cast(gdb.lookup_type("Right"))["right"])
@@ -0,0 +1,22 @@
+struct Left {
+  int left;
+};
+
+struct Root {
+  int root;
+};
+
+typedef Root RootAlias;
+
+struct Right : Root {
+  int right;
+};
+
+struct Derived : Left, Right {
+  int derived;
+};
+
+Derived d = {{1}, {{3}, 2}, 4};
+Derived d2 = {{10}, {{30}, 20}, 40};
+
+int main() { return 0; }
@@ -0,0 +1,17 @@
+import gala_bulk
+import gdb
+
+headers = gdb.parse_and_eval("headers")
+print("header: %s" % (gala_bulk.decode_bitfields(headers[2]),))
+
+columns = gala_bulk.bitfield_decoder(headers.type.target()).read_columns(
+    headers)
+for name in ("version", "type", "offset", "urgent"):
+  print("%s: %s" % (name, [int(x) for x in columns[name]]))
+
+words = gdb.parse_and_eval("words")
+bits = words.type.target().sizeof * 8
+print("set bits: %s" %
+      [(i // bits, i % bits) for i in gala_bulk.set_bit_indices(words)])
+first_word = words[0].address
+print("first bits: %s" % gala_bulk.set_bit_indices(first_word, 6))
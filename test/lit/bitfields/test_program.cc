@@ -0,0 +1,28 @@
+struct Header {
+  unsigned short length;
+  unsigned version : 4;
+  unsigned type : 4;
+  int offset : 12;
+  bool urgent : 1;
+};
+
+Header headers[3];
+
+unsigned long words[3];
+
+struct Init {
+  Init() {
+    for (int i = 0; i < 3; ++i) {
+      headers[i].length = 100 * i;
+      headers[i].version = i;
+      headers[i].type = 15 - i;
+      headers[i].offset = -i * 1000;
+      headers[i].urgent = i == 1;
+    }
+    words[0] = 1ul | (1ul << 5);
+    words[1] = 1ul << (sizeof(unsigned long) * 8 - 1);
+    words[2] = 1ul | (1ul << 7);
+  }
+} init;
+
+int main() { return 0; }
@@ -0,0 +1,22 @@
+import gala_bulk
+import gdb
+
+buckets = gdb.parse_and_eval("buckets")
+print("buckets: %s" % list(gala_bulk.occupied_indices(buckets)))
+first = next(gala_bulk.occupied_indices(buckets))
+print("first bucket key: %d" % int(buckets[first].dereference()["key"]))
+
+ctrl = gdb.parse_and_eval("ctrl")
+print("full: %s" % list(gala_bulk.control_byte_indices(ctrl, 8)))
+print("deleted: %s" %
+      list(gala_bulk.control_byte_indices(ctrl, 8, mask=0xff, value=0xfe)))
+
+slots = gdb.parse_and_eval("slots_ptr")
+for i, slot in gala_bulk.occupied_slots(
+    slots, gala_bulk.control_byte_indices(ctrl, 8)):
+  print("slot %d: %d" % (i, int(slot["value"])))
+
+try:
+  list(gala_bulk.occupied_indices(slots, 8))
+except TypeError as e:
+  print("error: %s" % e)
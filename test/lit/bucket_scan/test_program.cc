@@ -0,0 +1,30 @@
+#include <stdint.h>
+
+struct Entry {
+  int key;
+  int value;
+};
+
+// Buckets of a chained hash table. Most are empty.
+Entry entries[3] = {{1, 10}, {2, 20}, {3, 30}};
+Entry *buckets[100000];
+
+// An open-addressing table with Swiss-table style control bytes: kEmpty is
+// -128, kDeleted is -2, and full slots have the high bit clear.
+const int kCapacity = 8;
+int8_t ctrl[kCapacity] = {-128, 5, -2, 17, -128, -128, 0, -128};
+Entry slots[kCapacity];
+Entry *slots_ptr = slots;
+
+struct Init {
+  Init() {
+    buckets[7] = &entries[0];
+    buckets[4242] = &entries[1];
+    buckets[99999] = &entries[2];
+    slots[1] = {1, 10};
+    slots[3] = {3, 30};
+    slots[6] = {6, 60};
+  }
+} init;
+
+int main() { return 0; }
@@ -0,0 +1,15 @@
+import gdb
+
+# Children of `parse_and_eval` results (lldb ConstResults) are frozen copies,
+# so use the variable itself to check that children follow the process.
+s = gdb.Value(gdb.gala_get_current_target().FindFirstGlobalVariable("s"))
+print("x = %d" % s["x"])
+print("same member: %s" % (s["x"] is s["x"]))
+print("same element: %s" % (s["elems"][1] is s["elems"][1]))
+x_field = s.type["x"]
+print("same field: %s" % (s[x_field] is s[x_field]))
+
+
+def check_after_resume():
+  print("x after resume = %d" % s["x"])
+  print("elems[1] after resume = %d" % s["elems"][1])
@@ -0,0 +1,11 @@
+struct S {
+  int x;
+  int elems[3];
+};
+
+S s = {1, {0, 10, 0}};
+
+int main() {
+  s.x = 2, s.elems[1] = 20;
+  return 0;
+}
@@ -0,0 +1,27 @@
+import gdb
+import gdb.types
+
+derived = gdb.lookup_type("Derived")
+alias = gdb.lookup_type("Alias")
+
+print("keys: %s" % derived.keys())
+print("Derived['y'].bitpos = %d" % derived["y"].bitpos)
+print("'x' in Derived: %s" % ("x" in derived))
+print("'b' in Derived: %s" % ("b" in derived))
+print("has_field(Derived, 'b'): %s" % gdb.types.has_field(derived, "b"))
+print("has_field(Derived, 'z'): %s" % gdb.types.has_field(derived, "z"))
+print("has_field(Alias, 'x'): %s" % gdb.types.has_field(alias, "x"))
+
+fields = derived.fields()
+print("same fields: %s" %
+      all(a is b for a, b in zip(fields, derived.fields())))
+
+d = gdb.parse_and_eval("d")
+for f in fields:
+  if f.is_base_class:
+    print("d[%s]['b'] = %d" % (f.name, d[f]["b"]))
+  else:
+    print("d[%s] = %d" % (f.name, d[f]))
+
+a = gdb.parse_and_eval("a")
+print("alias[y] = %d" % a[alias["y"]])
@@ -0,0 +1,15 @@
+struct Base {
+  int b;
+};
+
+struct Derived : Base {
+  int x;
+  int y;
+};
+
+typedef Derived Alias;
+
+Derived d = {{1}, 2, 3};
+Alias a = {{1}, 2, 3};
+
+int main() { return 0; }
@@ -0,0 +1,9 @@
+import gdb
+import gdb.types
+
+for name in ["none", "read", "read_write", "with_unknown", "only_unknown",
+             "not_flag"]:
+  print("%s = %s" % (name, gdb.parse_and_eval(name)))
+
+print("make_enum_dict = %s" %
+      sorted(gdb.types.make_enum_dict(gdb.lookup_type("Flags")).items()))
@@ -0,0 +1,23 @@
+// The fixed underlying type makes values outside the enumerators valid.
+enum Flags : unsigned {
+  NONE = 0,
+  READ = 1,
+  WRITE = 2,
+  EXEC = 4,
+};
+
+// 3 shares bits with 1 and 2, so this is not a flag enum.
+enum NotFlags : unsigned {
+  ONE = 1,
+  TWO = 2,
+  THREE = 3,
+};
+
+Flags none = NONE;
+Flags read = READ;
+Flags read_write = Flags(READ | WRITE);
+Flags with_unknown = Flags(READ | EXEC | 16);
+Flags only_unknown = Flags(32);
+NotFlags not_flag = NotFlags(5);
+
+int main() { return 0; }
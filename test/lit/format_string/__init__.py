@@ -0,0 +1,27 @@
+import gdb
+
+
+def show(expr, **kwargs):
+  print("%s: %s" % (expr, gdb.parse_and_eval(expr).format_string(**kwargs)))
+
+
+show("zeros")
+show("mixed")
+show("mixed", repeat_threshold=0)
+show("mixed", repeat_threshold=3, array_indexes=True)
+show("counting", max_elements=5)
+show("text")
+show("text", max_elements=2)
+show("points", pretty_structs=False)
+show("shape", pretty_structs=False)
+show("shape", pretty_structs=False, max_depth=0)
+show("shape", pretty_structs=False, unions=False, summary=False)
+show("shape.tag", format="x")
+show("shape.color", format="d")
+show("shape.origin")
+show("shape.origin", pretty_structs=True)
+show("shape", summary=True)
+try:
+  show("shape", format="q")
+except ValueError as e:
+  print("error: %s" % e)
@@ -0,0 +1,41 @@
+enum Color { RED, GREEN, BLUE };
+
+struct Point {
+  int x;
+  int y;
+};
+
+struct Base {
+  int id;
+};
+
+struct Shape : Base {
+  Point origin;
+  Color color;
+  bool visible;
+  char tag;
+  const char *name;
+  union {
+    int i;
+    float f;
+  } u;
+  union {
+    int ai;
+    float af;
+  };
+};
+
+int zeros[1 << 18];
+int mixed[] = {1, 2, 2, 2, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 4};
+int counting[300];
+char text[16] = "gala";
+Point points[3] = {{1, 2}, {1, 2}, {5, 6}};
+Shape shape = {{7}, {1, 2}, BLUE, true, 'a', "square", {42}, {9}};
+
+struct Init {
+  Init() {
+    for (int i = 0; i < 300; ++i) counting[i] = i;
+  }
+} init;
+
+int main() { return 0; }
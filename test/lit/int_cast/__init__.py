@@ -4,3 +4,16 @@ print("b1: %d" % gdb.parse_and_eval("my_numbers.b1"))
 print("(int)b1: %d" % gdb.parse_and_eval("my_numbers.b1").cast(gdb.lookup_type("int")))
 print("s1: %d" % gdb.parse_and_eval("my_numbers.s1"))
 print("(int)s1: %d" % gdb.parse_and_eval("my_numbers.s1").cast(gdb.lookup_type("int")))
+
+int_type = gdb.lookup_type("int")
+print("(int)negative_byte: %d" %
+      gdb.parse_and_eval("negative_byte").cast(int_type))
+print("(unsigned int)negative_byte: %d" %
+      gdb.parse_and_eval("negative_byte").cast(gdb.lookup_type("unsigned int")))
+print("(uint16_t)big: %d" %
+      gdb.parse_and_eval("big").cast(gdb.lookup_type("uint16_t")))
+print("(int)small: %d" % gdb.parse_and_eval("small").cast(int_type))
+print("(Small)2L: %s" % gdb.Value(2).cast(gdb.lookup_type("Small")))
+bool_type = gdb.lookup_type("bool")
+print("(bool)256: %s" % gdb.Value(256).cast(bool_type))
+print("(bool)0: %s" % gdb.Value(0).cast(bool_type))
@@ -10,6 +10,12 @@ struct Numbers {
 
 Numbers my_numbers = {1, 2, 3, 4, 5, 6};
 
+enum Small : int8_t { NEGATIVE = -2, POSITIVE = 2 };
+
+int8_t negative_byte = -3;
+int big = 0x12345;
+Small small = NEGATIVE;
+
 int main() {
   return 0;
 }
@@ -0,0 +1,45 @@
+import gdb
+import gdb.printing
+
+
+class BufferPrinter:
+  def __init__(self, val):
+    self.val = val
+
+  def to_string(self):
+    return self.val["data"].lazy_string(length=int(self.val["size"]))
+
+
+class CStringPrinter:
+  def __init__(self, val):
+    self.val = val
+
+  def to_string(self):
+    return self.val["str"].lazy_string()
+
+
+class NamePrinter:
+  def __init__(self, val):
+    self.val = val
+
+  def to_string(self):
+    return self.val["text"].lazy_string()
+
+
+class WordsPrinter:
+  def __init__(self, val):
+    self.val = val
+
+  def to_string(self):
+    return "words"
+
+  def children(self):
+    yield "first", self.val["text"].lazy_string(length=3)
+
+
+printer = gdb.printing.RegexpCollectionPrettyPrinter("lazy_string")
+printer.add_printer("Buffer", "^Buffer$", BufferPrinter)
+printer.add_printer("CString", "^CString$", CStringPrinter)
+printer.add_printer("Name", "^Name$", NamePrinter)
+printer.add_printer("Words", "^Words$", WordsPrinter)
+gdb.printing.register_pretty_printer(gdb.current_objfile(), printer)
@@ -0,0 +1,31 @@
+#include <string.h>
+
+struct Buffer {
+  char *data;
+  unsigned long size;
+};
+
+struct CString {
+  const char *str;
+};
+
+struct Name {
+  char text[16];
+};
+
+struct Words {
+  const char *text;
+};
+
+char big[1 << 20];
+
+int main() {
+  memset(big, 'x', sizeof(big) - 1);
+  Buffer buffer = {big, sizeof(big) - 1};
+  Buffer small = {big, 5};
+  CString cstring = {"hello"};
+  CString null = {nullptr};
+  Name name = {"gala"};
+  Words words = {"abc def"};
+  return 0;  // break here
+}
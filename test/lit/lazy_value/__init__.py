@@ -0,0 +1,34 @@
+import gdb
+
+print("evaluated is_lazy: %s" % gdb.parse_and_eval("ptr").is_lazy)
+
+ptr = gdb.parse_and_eval("ptr")
+element = ptr[500000]
+print("element is_lazy: %s" % element.is_lazy)
+print("element address ok: %s" %
+      (int(element.address) == int(gdb.parse_and_eval("&big[500000]"))))
+element.fetch_lazy()
+print("element is_lazy after fetch_lazy: %s" % element.is_lazy)
+print("element = %d" % element)
+print("array element = %d" % gdb.parse_and_eval("big")[500000])
+
+p3 = ptr + 3
+print("ptr + 3 = %d" % (p3 - ptr))
+deref = p3.dereference()
+print("(ptr + 3).dereference() is_lazy: %s" % deref.is_lazy)
+
+head = gdb.parse_and_eval("head")
+print("next value = %d" % head["next"]["value"])
+print("next address ok: %s" %
+      (int(head["next"].address) == int(gdb.parse_and_eval("&head->next"))))
+print("str(member) = %s" % head["value"])
+
+# Lazy members get the same SBValue as members looked up through lldb.
+baseline = head.sbvalue().Dereference().GetChildMemberWithName("pos")
+pos = head["pos"]
+print("member is_lazy: %s" % pos.is_lazy)
+print("str(member) same: %s" % (str(pos) == str(gdb.Value(baseline))))
+print("member name: %s" % pos.sbvalue().GetName())
+pos_field = head.dereference().type.fields()[2]
+print("str(field) same: %s" %
+      (str(head.dereference()[pos_field]) == str(gdb.Value(baseline))))
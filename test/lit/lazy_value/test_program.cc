@@ -0,0 +1,26 @@
+int big[1000000];
+int *ptr = big;
+
+struct Init {
+  Init() {
+    big[3] = 3;
+    big[500000] = 7;
+  }
+} init;
+
+struct Point {
+  int x;
+  int y;
+};
+
+struct Node {
+  int value;
+  Node *next;
+  Point pos;
+};
+
+Node second = {2, nullptr, {5, 6}};
+Node first = {1, &second, {3, 4}};
+Node *head = &first;
+
+int main() { return 0; }
@@ -17,3 +17,15 @@ config.environment['PYTHONPATH'] = os.pathsep.join([
 config.substitutions.append( ('%clangxx', 'clang++') )
 config.substitutions.append( ('%clang', 'clang') )
 config.substitutions.append( ('%lldb', 'lldb -S lldbinit-gala') )
+
+# Don't let tests read or write the user's on-disk type index. Tests for the
+# index set their own.
+config.environment['GALA_TYPE_INDEX'] = ''
+
+# Tests for the NumPy-based helpers need NumPy to be importable by lldb's
+# Python. Assume it's the same Python running lit.
+try:
+  import numpy
+  config.available_features.add('numpy')
+except ImportError:
+  pass
@@ -18,3 +18,11 @@ test("::NonExistingType")
 test("Templated<int>::InTemplate")
 test("Templated<ns::ClassInNS>::InTemplate")
 test("Templated<ns::ClassInNS>::MoreTemplates<ns::ClassInNS>")
+
+# Different spellings of the same name resolve to the same (cached) type, and
+# failed lookups keep failing.
+print("same type: %s" % (gdb.lookup_type("Templated<ns::ClassInNS>::InTemplate")
+                         is gdb.lookup_type(
+                             "::Templated< ns::ClassInNS >::InTemplate")))
+print("same builtin: %s" % (gdb.lookup_type("int") is gdb.lookup_type("int")))
+test("::NonExistingType")
@@ -0,0 +1,36 @@
+import gdb
+
+s = gdb.parse_and_eval("s")
+gdb.gala_flush_memory_cache()
+
+stats = gdb.gala_memory_cache_stats()
+print("first read: %s" % s.string())
+new_stats = gdb.gala_memory_cache_stats()
+print("first read missed: %s" % (new_stats["misses"] > stats["misses"]))
+
+stats = new_stats
+print("second read: %s" % s.string())
+new_stats = gdb.gala_memory_cache_stats()
+print("second read hit: %s" % (new_stats["hits"] > stats["hits"]))
+print("second read missed: %s" % (new_stats["misses"] > stats["misses"]))
+
+stats = new_stats
+gdb.selected_inferior().read_memory(int(s), 5)
+new_stats = gdb.gala_memory_cache_stats()
+print("read_memory hit: %s" % (new_stats["hits"] > stats["hits"]))
+
+inferior = gdb.selected_inferior()
+address = int(gdb.parse_and_eval("&buffer"))
+print("before write: %s" % inferior.read_memory(address, 4).tobytes())
+inferior.write_memory(address, b"xy")
+print("after write: %s" % inferior.read_memory(address, 4).tobytes())
+gdb.parse_and_eval("buffer[2] = 'z'")
+print("after assignment: %s" % inferior.read_memory(address, 4).tobytes())
+
+
+def check_after_resume():
+  stats = gdb.gala_memory_cache_stats()
+  print("after resume: %d" % gdb.parse_and_eval("counter"))
+  gdb.parse_and_eval("s").string()
+  new_stats = gdb.gala_memory_cache_stats()
+  print("read after resume missed: %s" % (new_stats["misses"] > stats["misses"]))
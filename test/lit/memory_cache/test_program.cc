@@ -0,0 +1,8 @@
+const char *s = "Hello, World!";
+int counter = 0;
+char buffer[] = "abcd";
+
+int main() {
+  counter++;
+  return 0;
+}
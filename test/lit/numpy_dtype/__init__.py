@@ -0,0 +1,22 @@
+import gala_bulk
+import gdb
+
+particles = gdb.parse_and_eval("particles")
+dtype = gala_bulk.numpy_dtype(particles.type.target())
+print("names: %s" % ", ".join(dtype.names))
+print("itemsize ok: %s" % (dtype.itemsize == particles.type.target().sizeof))
+print("mass offset ok: %s" %
+      (dtype.fields["mass"][1] ==
+       int(particles[0]["mass"].address) - int(particles.address)))
+
+array = gala_bulk.read_numpy_array(particles)
+print("ids: %s" % [int(x) for x in array["Entity"]["id"]])
+print("tags: %s" % [int(x) for x in array["tag"]])
+print("mass: %s" % [float(x) for x in array["mass"]])
+print("pos.y: %s" % [float(x) for x in array["pos"]["y"]])
+print("history: %s" % [int(x) for x in array["history"][2]])
+print("side: %s" % [int(x) for x in array["side"]])
+print("ival: %s" % [int(x) for x in array["ival"]])
+
+from_ptr = gala_bulk.read_numpy_array(gdb.parse_and_eval("particles_ptr"), 2)
+print("from pointer: %s" % [float(x) for x in from_ptr["mass"]])
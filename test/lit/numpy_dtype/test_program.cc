@@ -0,0 +1,43 @@
+enum Side { BID, ASK };
+
+struct Vec {
+  float x, y;
+};
+
+struct Entity {
+  int id;
+};
+
+struct Particle : Entity {
+  char tag;
+  double mass;
+  Vec pos;
+  short history[3];
+  Side side;
+  union {
+    int ival;
+    float fval;
+  };
+  unsigned flag : 1;
+};
+
+Particle particles[3];
+Particle *particles_ptr = particles;
+
+struct Init {
+  Init() {
+    for (int i = 0; i < 3; ++i) {
+      particles[i].id = i;
+      particles[i].tag = 'a' + i;
+      particles[i].mass = i + 0.5;
+      particles[i].pos.x = i;
+      particles[i].pos.y = -i;
+      particles[i].history[0] = i;
+      particles[i].history[2] = 10 * i;
+      particles[i].side = i % 2 ? ASK : BID;
+      particles[i].ival = 100 + i;
+    }
+  }
+} init;
+
+int main() { return 0; }
@@ -0,0 +1,13 @@
+import gdb
+
+print("print characters: %s" % gdb.parameter("print characters"))
+gdb.gala_get_current_debugger().HandleCommand(
+    "settings set target.max-string-summary-length 33")
+print("print characters after change: %s" %
+      gdb.parameter("print characters"))
+print("print max-depth is an int: %s" %
+      isinstance(gdb.parameter("print max-depth"), int))
+print("print repeats: %s" % gdb.parameter("print repeats"))
+print("print null-stop: %s" % gdb.parameter("print null-stop"))
+print("print pretty: %s" % gdb.parameter("print pretty"))
+print("unknown: %s" % gdb.parameter("print nonexistent-parameter"))
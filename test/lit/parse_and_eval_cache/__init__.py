@@ -0,0 +1,40 @@
+import gdb
+
+_first_config = None
+
+
+def at_break_1():
+  global _first_config
+  value = gdb.parse_and_eval("g_value")
+  print("g_value: %d" % value)
+  print("same object: %s" % (value is gdb.parse_and_eval("g_value")))
+  gdb.parse_and_eval("counter++")
+  gdb.parse_and_eval("counter++")
+  print("counter: %d" % gdb.parse_and_eval("counter"))
+  gdb.gala_parse_and_eval_uncached("counter += 10")
+  print("counter: %d" % gdb.parse_and_eval("counter"))
+  print("kFast: %s" % gdb.parse_and_eval("kFast"))
+  _first_config = gdb.parse_and_eval("g_config")
+  print("level: %d" % _first_config["level"])
+
+
+def at_break_2():
+  print("g_value: %d" % gdb.parse_and_eval("g_value"))
+  config = gdb.parse_and_eval("g_config")
+  print("level: %d" % config["level"])
+  print("new object: %s" % (config is not _first_config))
+  print("kFast: %s" % gdb.parse_and_eval("kFast"))
+  print("shadow: %d" % gdb.parse_and_eval("shadow"))
+
+
+def at_method():
+  print("level: %d" % gdb.parse_and_eval("level"))
+  print("count: %d" % gdb.parse_and_eval("count"))
+  print("g_value: %d" % gdb.parse_and_eval("g_value"))
+
+
+def at_break_3():
+  print("shadow: %d" % gdb.parse_and_eval("shadow"))
+  print("::shadow: %d" % gdb.parse_and_eval("::shadow"))
+  print("level: %d" % gdb.parse_and_eval("level"))
+  print("count: %d" % gdb.parse_and_eval("count"))
@@ -0,0 +1,37 @@
+enum Mode { kFast = 3 };
+
+struct Config {
+  int level;
+};
+
+int g_value = 1;
+int counter = 0;
+int shadow = 100;
+Config g_config = {5};
+int level = 50;
+int count = 40;
+
+struct Widget {
+  int level;
+  static int count;
+
+  int get() {
+    return level + count;  // break method
+  }
+};
+
+int Widget::count = 4;
+Widget g_widget = {8};
+
+int use_shadow() {
+  int shadow = 7;
+  return shadow;  // break 3
+}
+
+int main() {
+  g_value = 2;  // break 1
+  g_config.level = 6;
+  g_value = 3;  // break 2
+  g_widget.get();
+  return use_shadow();
+}
@@ -8,3 +8,14 @@ print(hello)
 print(s.string())
 print(repr(s.string()))
 
+
+# Batched reads, including overlapping and out of order ranges.
+inferior = gdb.selected_inferior()
+address = int(s)
+parts = inferior.read_memory_many(
+    [(address + 7, 5), (address, 5), (address + 3, 4), (address, 0)])
+print([bytes(p) for p in parts])
+
+buf = bytearray(5)
+inferior.read_memory_into(address + 7, buf)
+print(bytes(buf))
@@ -0,0 +1,19 @@
+import gala_bulk
+import gdb
+
+records = gdb.parse_and_eval("records")
+r = gala_bulk.decode_record(records[0])
+print("fields: %s" % ", ".join(r._fields))
+print("id=%d c=%d d=%s b=%s color=%d u=%d small=%d flag=%d" %
+      (r.id, r.c, r.d, r.b, r.color, r.u, r.small, r.flag))
+print("ptr ok: %s" % (r.ptr == int(gdb.parse_and_eval("&value"))))
+print("i=%d" % r.i)
+
+decoder = gala_bulk.record_decoder(records.type.target(), ["f", "id"])
+print("same decoder: %s" %
+      (decoder is gala_bulk.record_decoder(records.type.target(), ("f", "id"))))
+print("array: %s" % [tuple(x) for x in decoder.read_array(records.address, 2)][1:])
+try:
+  gala_bulk.decode_record(records[0], ["nope"])
+except gdb.error as e:
+  print("error: %s" % e)
@@ -0,0 +1,42 @@
+enum Color { RED, GREEN, BLUE };
+
+struct Base {
+  int id;
+};
+
+struct Record : Base {
+  char c;
+  double d;
+  bool b;
+  Color color;
+  int *ptr;
+  union {
+    int i;
+    float f;
+  };
+  unsigned short u;
+  int small : 4;
+  unsigned flag : 1;
+};
+
+int value = 5;
+Record records[2];
+
+struct Init {
+  Init() {
+    records[0].id = 1;
+    records[0].c = 'a';
+    records[0].d = 2.5;
+    records[0].b = true;
+    records[0].color = BLUE;
+    records[0].ptr = &value;
+    records[0].i = 42;
+    records[0].u = 65535;
+    records[0].small = -3;
+    records[0].flag = 1;
+    records[1].id = 2;
+    records[1].f = 1.5;
+  }
+} init;
+
+int main() { return 0; }
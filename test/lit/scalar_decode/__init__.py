@@ -0,0 +1,23 @@
+import gdb
+
+
+def describe(v):
+  return "a=%d b=%d c=%d s=%d ld=%s f=%s e=%s" % (
+      v["a"], v["b"], v["c"], v["s"], float(v["ld"]), float(v["f"]), v["e"])
+
+
+bits_ptr = gdb.parse_and_eval("bits_ptr")
+print("bits_ptr: %s" % describe(bits_ptr))
+print("bits: %s" % describe(gdb.parse_and_eval("bits")))
+
+# Children of `parse_and_eval` results (lldb ConstResults) are frozen copies,
+# so use the variables themselves to check that values follow the process.
+target = gdb.gala_get_current_target()
+live_bits_ptr = gdb.Value(target.FindFirstGlobalVariable("bits_ptr"))
+live_bits = gdb.Value(target.FindFirstGlobalVariable("bits"))
+print("live a = %d" % live_bits_ptr["a"])
+
+
+def check_after_resume():
+  print("a after resume = %d" % live_bits_ptr["a"])
+  print("bits.a after resume = %d" % live_bits["a"])
@@ -0,0 +1,19 @@
+enum E : short { A, B, C };
+
+struct Bits {
+  int a : 3;
+  unsigned b : 5;
+  int c : 4;
+  short s;
+  long double ld;
+  float f;
+  E e;
+};
+
+Bits bits = {-2, 17, 5, -7, 2.5L, 1.25f, B};
+Bits *bits_ptr = &bits;
+
+int main() {
+  bits.a = 1;
+  return 0;
+}
@@ -0,0 +1,19 @@
+import gdb
+
+v = gdb.Value(5)
+print("v = %s" % v)
+print("v.type = %s" % v.type)
+r = (v + 1) * 2
+print("(v + 1) * 2 = %d" % r)
+print("~v = %s" % ~v)
+print("Value(True) = %s" % gdb.Value(True))
+
+d = gdb.Value(2.5)
+print("d = %s" % d)
+print("d.type = %s" % d.type)
+
+arr = gdb.parse_and_eval("arr")
+print("arr[v - 3] = %d" % arr[v - 3])
+
+print("sbvalue = %d" % r.sbvalue().GetValueAsSigned())
+print("copy = %s" % gdb.Value(r))
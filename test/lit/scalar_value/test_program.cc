@@ -0,0 +1,3 @@
+int arr[] = {10, 20, 30, 40};
+
+int main() { return 0; }
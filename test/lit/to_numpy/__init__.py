@@ -0,0 +1,18 @@
+import gdb
+
+
+def elements(name, convert, count=None):
+  values = gdb.parse_and_eval(name).to_numpy(count)
+  return [convert(x) for x in values]
+
+
+print("doubles: %s" % elements("doubles", float))
+print("shorts: %s" % elements("shorts", int))
+print("bools: %s" % elements("bools", int))
+print("enums: %s" % elements("enums", int))
+print("pointer: %s" % elements("ints_ptr", int, 2))
+print("empty: %s" % elements("ints_ptr", int, 0))
+try:
+  gdb.parse_and_eval("points").to_numpy()
+except TypeError as e:
+  print("struct error: %s" % e)
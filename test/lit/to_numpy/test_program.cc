@@ -0,0 +1,15 @@
+enum Color { RED, GREEN, BLUE };
+
+struct Point {
+  int x, y;
+};
+
+double doubles[] = {0.5, 1.5, 2.5, 3.5};
+short shorts[] = {-1, 2, -3};
+bool bools[] = {true, false, true};
+Color enums[] = {RED, BLUE, GREEN};
+int ints[] = {10, 20, 30};
+int *ints_ptr = ints;
+Point points[2];
+
+int main() { return 0; }
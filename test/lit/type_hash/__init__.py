@@ -0,0 +1,20 @@
+import gdb
+
+my_struct = gdb.lookup_type("MyStruct")
+alias = gdb.lookup_type("MyAlias")
+s = gdb.parse_and_eval("s")
+
+print("lookup == value type: %s" % (my_struct == s.type))
+print("typedef == target: %s" % (alias == my_struct))
+print("stripped typedef == target: %s" % (alias.strip_typedefs() == my_struct))
+print("int == MyStruct: %s" % (gdb.lookup_type("int") == my_struct))
+print("pointer == pointer: %s" % (my_struct.pointer() == s.type.pointer()))
+
+printers = {my_struct: "MyStruct printer"}
+print("dict lookup: %s" % printers[s.type])
+print("set size: %d" % len({my_struct, s.type, alias}))
+
+first = s["first"].type
+second = s["second"].type
+print("anonymous types equal: %s" % (first == second))
+print("anonymous type interned: %s" % (first is s.type.fields()[1].type))
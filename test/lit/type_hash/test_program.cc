@@ -0,0 +1,16 @@
+struct MyStruct {
+  int x;
+  struct {
+    int a;
+  } first;
+  struct {
+    long b;
+  } second;
+};
+
+typedef MyStruct MyAlias;
+
+MyStruct s;
+MyAlias alias;
+
+int main() { return 0; }
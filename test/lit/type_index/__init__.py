@@ -0,0 +1,26 @@
+import json
+import os
+
+import gdb
+import lldb
+
+
+def indexed():
+  if not hasattr(lldb.SBType, "GetModule"):
+    # Older versions of lldb can't tell us which module defines a type, so
+    # nothing gets indexed there.
+    return True
+  try:
+    with open(os.environ["GALA_TYPE_INDEX"]) as f:
+      index = json.load(f)
+  except FileNotFoundError:
+    return False
+  return any("ns::Indexed" in names for names in index.values())
+
+
+print("ns::Indexed => %s" % gdb.lookup_type("ns::Indexed").name)
+# New entries are only written when the index is flushed, so only the second
+# session sees the type in the index before flushing.
+print("indexed before flush: %s" % indexed())
+gdb.gala_flush_type_index()
+print("indexed: %s" % indexed())
@@ -0,0 +1,9 @@
+namespace ns {
+struct Indexed {
+  int x;
+};
+}  // namespace ns
+
+ns::Indexed indexed;
+
+int main() { return 0; }
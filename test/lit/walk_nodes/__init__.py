@@ -0,0 +1,30 @@
+import gala_bulk
+import gdb
+
+
+def values(nodes, field):
+  return [int(node.dereference()[field]) for node in nodes]
+
+
+print("list: %s" %
+      values(gala_bulk.walk_list(gdb.parse_and_eval("list"), "next"), "value"))
+print("limit: %s" % values(
+    gala_bulk.walk_list(gdb.parse_and_eval("list"), "next", 1), "value"))
+print("circular: %s" % values(
+    gala_bulk.walk_list(gdb.parse_and_eval("circular"), "next"), "value"))
+print("from object: %s" % values(
+    gala_bulk.walk_list(gdb.parse_and_eval("*circular"), "next"), "value"))
+print("tree: %s" % values(
+    gala_bulk.walk_tree_inorder(gdb.parse_and_eval("root"), "left", "right"),
+    "key"))
+print("tree limit: %s" % values(
+    gala_bulk.walk_tree_inorder(gdb.parse_and_eval("root"), "left", "right",
+                                3), "key"))
+try:
+  next(gala_bulk.walk_list(gdb.parse_and_eval("list"), "value"))
+except gdb.error as e:
+  print("error: %s" % e)
+try:
+  next(gala_bulk.walk_list(gdb.parse_and_eval("bad"), "next"))
+except gdb.error as e:
+  print("error: %s" % e)
@@ -0,0 +1,64 @@
+struct ListBase {
+  ListBase *next;
+};
+
+struct Header {
+  long tag;
+};
+
+// `next` points to the ListBase subobject, which is not at the start of the
+// node.
+struct ListNode : Header, ListBase {
+  int value;
+};
+
+struct Unrelated {
+  int x;
+};
+
+struct BadNode {
+  Unrelated *next;
+};
+
+struct TreeNode {
+  int key;
+  TreeNode *left;
+  TreeNode *right;
+};
+
+ListNode list_nodes[4];
+ListNode *list = &list_nodes[0];
+ListNode *circular = &list_nodes[2];
+BadNode bad_node;
+BadNode *bad = &bad_node;
+
+TreeNode tree_nodes[5];
+TreeNode *root = &tree_nodes[0];
+
+struct Init {
+  Init() {
+    for (int i = 0; i < 4; ++i) list_nodes[i].value = i;
+    list_nodes[0].next = &list_nodes[1];
+    list_nodes[1].next = &list_nodes[2];
+    // 2 -> 3 -> 2 is a cycle.
+    list_nodes[2].next = &list_nodes[3];
+    list_nodes[3].next = &list_nodes[2];
+
+    //       3
+    //     1   4
+    //    0 2
+    for (int i = 0; i < 5; ++i) tree_nodes[i].key = i;
+    tree_nodes[0].key = 3;
+    tree_nodes[3].key = 0;
+    tree_nodes[0].left = &tree_nodes[1];
+    tree_nodes[0].right = &tree_nodes[4];
+    tree_nodes[1].left = &tree_nodes[3];
+    tree_nodes[1].right = &tree_nodes[2];
+  }
+} init;
+
+int main() {
+  // End the list with a pointer to unmapped memory.
+  list_nodes[1].next = (ListBase *)0x10;
+  return 0;
+}
@@ -0,0 +1,13 @@
+import gdb
+
+print("narrow: %r" % gdb.parse_and_eval("narrow").string())
+print("wide: %r" % gdb.parse_and_eval("wide").string())
+print("utf16: %r" % gdb.parse_and_eval("utf16").string())
+print("utf32: %r" % gdb.parse_and_eval("utf32").string())
+print("array: %r" % gdb.parse_and_eval("array").string())
+
+print("length: %r" % gdb.parse_and_eval("narrow").string(length=6))
+print("wide length: %r" % gdb.parse_and_eval("wide").string(length=4))
+
+print("long string length: %d" %
+      len(gdb.parse_and_eval("long_string").string()))
@@ -0,0 +1,16 @@
+const char *narrow = "narrow string";
+const wchar_t *wide = L"wide string";
+const char16_t *utf16 = u"utf-16 string";
+const char32_t *utf32 = U"utf-32 string";
+char array[16] = "in an array";
+
+// Long enough to need several reads. Filled in before main() runs.
+char long_string[10001];
+struct LongStringFiller {
+  LongStringFiller() {
+    for (int i = 0; i < 10000; ++i)
+      long_string[i] = 'a' + i % 26;
+  }
+} filler;
+
+int main() { return 0; }